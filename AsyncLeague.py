@@ -0,0 +1,185 @@
+import asyncio
+from League import League
+from Team import compact_daily_frame
+from api_requests import ESPNRequestError
+from async_requests import AsyncESPNRequester
+
+
+class AsyncLeague(League):
+    """
+    League whose data is fetched with AsyncESPNRequester.  Build it with the create coroutine:
+
+        league = await AsyncLeague.create(league_id, season_id)
+
+    Independent requests (the league bootstrap and the player pool, or the scoring periods of
+    get_all_daily_stats) run concurrently, bounded by the requester's max_concurrency.
+
+    League methods that would fetch data synchronously are either coroutines here or take the data as a parameter
+    and raise NotImplementedError without it.
+    """
+
+    def __init__(self, league_id, season_id, swid=None, espn_s2=None, requester=None, **requester_kwargs):
+        if requester is None:
+            requester = AsyncESPNRequester(league_id, season_id, swid, espn_s2, **requester_kwargs)
+        super().__init__(league_id, season_id, swid, espn_s2, requester=requester)
+
+    @classmethod
+    async def create(cls, league_id, season_id, swid=None, espn_s2=None, requester=None, **requester_kwargs):
+        """
+        Creates an AsyncLeague and loads its settings, player pool and teams.
+        :param requester: Optional AsyncESPNRequester, for instance one sharing a session or semaphore with other
+                          leagues.
+        :param requester_kwargs: Keyword arguments passed to AsyncESPNRequester when requester is omitted.
+        :return: AsyncLeague
+        """
+        league = cls(league_id, season_id, swid, espn_s2, requester=requester, **requester_kwargs)
+        await league.load()
+        return league
+
+    def _load(self):
+        # Data is loaded asynchronously by load(); the synchronous constructor only sets up attributes
+        pass
+
+    async def load(self):
+        """
+        Fetches the league bootstrap and the player pool concurrently and parses them.
+        :return: None
+        :raises ESPNRequestError: If the bootstrap or the player pool could not be fetched.
+        """
+        bootstrap, player_data = await asyncio.gather(self.req.get_league_bootstrap(), self.req.get_all_players())
+        # fetch_data has already retried both requests
+        if not bootstrap:
+            raise ESPNRequestError(f"Could not fetch the settings and teams of league {self.league_id}")
+        if not player_data:
+            raise ESPNRequestError(f"Could not fetch the player pool of league {self.league_id}")
+        teams_json = bootstrap.get("teams")
+        self.get_league_info(bootstrap)
+        self.update_player_pool(player_data)
+        self.update_teams(teams_json, teams_json)
+        self.update_season_statistics()
+
+    def _load_teams(self):
+        raise NotImplementedError("AsyncLeague does not load lazily; await load() first")
+
+    def _load_player_pool(self):
+        raise NotImplementedError("AsyncLeague does not load lazily; await load() first")
+
+    def get_league_info(self, settings_json=None):
+        if settings_json is None:
+            raise NotImplementedError("AsyncLeague.get_league_info needs settings_json; await load() instead")
+        super().get_league_info(settings_json)
+
+    def update_teams(self, teams_json=None, rosters_json=None):
+        if teams_json is None or rosters_json is None:
+            raise NotImplementedError("AsyncLeague.update_teams needs teams_json and rosters_json")
+        super().update_teams(teams_json, rosters_json)
+
+    def update_player_pool(self, player_data=None):
+        if player_data is None:
+            raise NotImplementedError("AsyncLeague.update_player_pool needs player_data; await load() instead")
+        super().update_player_pool(player_data)
+
+    async def load_player_projections(self, path: str = 'kona_player_info.json'):
+        """
+        Coroutine version of League.load_player_projections.  The file is read synchronously and the rosters are
+        fetched again to point them at the new Player objects.
+        :param path: Path of the file.
+        :return: None
+        """
+        previous_table = self._player_table
+        try:
+            self.update_player_pool(self.req.iter_player_projections(path))
+        except ValueError as e:
+            print(f"⚠️ Error decoding {path}, keeping the current player pool: {e}")
+            return
+        if self._player_table is not previous_table and self._teams is not None:
+            self._link_rosters(await self.req.get_rosters())
+
+    async def close(self):
+        """
+        Closes the requester's session if the requester created it.
+        :return: None
+        """
+        await self.req.close()
+
+    async def update_daily_statistics(self, scoring_period_id: int, long_format: bool = False):
+        """
+        Gets statistics for players in active roster spots for every team roster in the specified scoring period.
+        :param scoring_period_id: The scoring period for which statistics will be gathered.
+        :param long_format: Return long frames with one row per non-zero stat.  See League.parse_daily_statistics.
+        :return: A tuple of hitting and pitching DataFrames for the scoring period.
+        """
+        league_roster_json = await self.req.get_daily_stats(scoring_period_id=scoring_period_id)
+        return self.parse_daily_statistics(league_roster_json, long_format)
+
+    async def get_all_daily_stats(self, long_format: bool = False):
+        """
+        Fetches every scoring period of the season concurrently and parses each one as it arrives.
+        If the coroutine is cancelled or a period fails to parse, the remaining requests are cancelled.
+        :param long_format: Return long frames with one row per non-zero stat.  See League.parse_daily_statistics.
+        :return: A tuple of hitting and pitching DataFrames ordered by scoring period.  Scoring periods that could
+                 not be fetched are left out and reported.
+        """
+        async def fetch(scoring_period_id):
+            return scoring_period_id, await self.req.get_daily_stats(scoring_period_id=scoring_period_id)
+
+        tasks = [asyncio.ensure_future(fetch(i)) for i in range(1, self.final_scoring_period + 1)]
+        daily_stats = {}
+        failed = []
+        try:
+            for next_completed in asyncio.as_completed(tasks):
+                scoring_period_id, league_roster_json = await next_completed
+                if not league_roster_json:
+                    failed.append(scoring_period_id)
+                    continue
+                daily_stats[scoring_period_id] = self.parse_daily_statistics(league_roster_json, long_format)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        self._report_failed_periods(failed)
+        return self._combine_daily_statistics(daily_stats)
+
+    def _get_daily_statistics_concurrently(self, *args, **kwargs):
+        raise NotImplementedError("AsyncLeague fetches scoring periods concurrently with get_all_daily_stats")
+
+    async def sync_daily_stats(self, store):
+        """
+        Coroutine version of League.sync_daily_stats.  The missing scoring periods are fetched concurrently and each
+        one is stored as soon as it arrives.
+        :param store: A daily_store.DailyStatsStore.
+        :return: A tuple of hitting and pitching DataFrames ordered by scoring period, with compact dtypes.
+        """
+        async def fetch(scoring_period_id):
+            return scoring_period_id, await self.req.get_daily_stats(scoring_period_id=scoring_period_id)
+
+        last_period = self.final_scoring_period
+        if self.current_scoring_period is not None:
+            last_period = min(last_period, self.current_scoring_period)
+        complete = store.complete_periods(self.league_id, self.season_id)
+        tasks = [asyncio.ensure_future(fetch(i)) for i in range(1, last_period + 1) if i not in complete]
+        failed = []
+        try:
+            for next_completed in asyncio.as_completed(tasks):
+                scoring_period_id, league_roster_json = await next_completed
+                if not league_roster_json:
+                    failed.append(scoring_period_id)
+                    continue
+                hitting, pitching = self.parse_daily_statistics(league_roster_json)
+                store.save_period(self.league_id, self.season_id, scoring_period_id, hitting, pitching,
+                                  self.req.is_complete(scoring_period_id))
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        if failed:
+            print(f"⚠️ Could not fetch scoring periods {sorted(failed)}; they are fetched again on the next sync")
+        hitting_df, pitching_df = store.load(self.league_id, self.season_id)
+        return compact_daily_frame(hitting_df), compact_daily_frame(pitching_df)
+
+    def get_roto_standings_series(self, hitting_df=None, pitching_df=None):
+        if hitting_df is None or pitching_df is None:
+            raise NotImplementedError("AsyncLeague.get_roto_standings_series needs the daily frames of "
+                                      "await get_all_daily_stats()")
+        return super().get_roto_standings_series(hitting_df, pitching_df)
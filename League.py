@@ -1,46 +1,204 @@
+import numpy as np
 import pandas as pd
-from api_requests import ESPNRequester
-from Team import Team
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from api_requests import ESPNRequester, PlayerPageError
+from Team import Team, concat_daily_frames, compact_daily_frame, build_matchup_period_lookup, pivot_daily_stats, \
+    schedule_matchup_periods, DEFAULT_MATCHUP_PERIOD_LOOKUP
 from espn_constant import HITTING_MAP, PITCHING_MAP
-from Player import Player
+from PlayerPool import PlayerPool, FREE_AGENT
+from PlayerTable import PlayerTable
+from roto import build_daily_cube, category_names, component_stats, roto_standings_series
+from roster_evaluator import RosterEvaluator
+from simulation import SeasonSimulator, projection_means
+from team_projections import PITCHER_POSITION_IDS, projected_categories, scenario_team_values, \
+    team_category_values
 import logging
 
 class League:
-    def __init__(self, league_id, season_id, swid=None, espn_s2=None):
-        self.req = ESPNRequester(league_id, season_id, swid, espn_s2)
+    def __init__(self, league_id, season_id, swid=None, espn_s2=None, session=None, cache=None, transport=None,
+                 requester=None, lazy=False, player_page_size=None):
+        """
+        :param lazy: If True only the league settings are fetched on construction.  teams, player_pool,
+                     season_hitting and season_pitching are loaded the first time they are accessed, each fetching
+                     only the views it needs.
+        :param player_page_size: If set, the player pool is fetched in concurrent pages of this many players and
+                                 parsed while later pages are still downloading.
+        :param session: Optional requests Session (see api_requests.create_session) shared with other Leagues so
+                        that they reuse the same pooled connections.
+        :param cache: Optional cache.ResponseCache used to avoid downloading unchanged data again.
+        :param transport: Optional transport (see transport.py), for example to record or replay API traffic.
+        :param requester: Optional preconfigured ESPNRequester.  session, cache and transport are ignored when it
+                          is given.
+        """
+        if requester is None:
+            requester = ESPNRequester(league_id, season_id, swid, espn_s2, session=session, cache=cache,
+                                      transport=transport)
+        self.req = requester
         self.league_id = league_id
         self.season_id = season_id
-        self.teams = []
-        self.season_hitting = pd.DataFrame()
-        self.season_pitching = pd.DataFrame()
+        self.lazy = lazy
+        self.player_page_size = player_page_size
+        # Backing attributes of the teams, player_pool, season_hitting and season_pitching properties.
+        # None means not loaded yet (lazy mode only).
+        self._teams = None
+        self._player_pool = None  # Dictionary to store all players
+        self._player_table = None  # Columnar PlayerTable the player pool's Player objects are views over
+        self._season_hitting = None
+        self._season_pitching = None
         self.final_scoring_period = None
-        self.player_pool = {}  # Dictionary to store all players
+        self.current_scoring_period = None
+        # Matchup period of each scoring period, indexed by scoring period
+        self.matchup_period_lookup = DEFAULT_MATCHUP_PERIOD_LOOKUP
 
         self.scoring_type = None
         # Roto Scoring Categories
         self.hitting_categories = {}
         self.pitching_categories = {}
-        
-        self.get_league_info()
+
+        if self.lazy:
+            self.get_league_info()
+        else:
+            self._teams = []
+            self._player_pool = PlayerPool()
+            self._season_hitting = pd.DataFrame()
+            self._season_pitching = pd.DataFrame()
+            self._load()
+
+    @property
+    def teams(self):
+        if self._teams is None:
+            self._load_teams()
+        return self._teams
+
+    @teams.setter
+    def teams(self, teams):
+        self._teams = teams
+
+    @property
+    def player_pool(self):
+        if self._player_pool is None:
+            self._load_player_pool()
+        return self._player_pool
+
+    @player_pool.setter
+    def player_pool(self, player_pool):
+        if player_pool is not None and not isinstance(player_pool, PlayerPool):
+            player_pool = PlayerPool(player_pool)
+        self._player_pool = player_pool
+        # The table no longer matches the pool; player_table rebuilds it from the players when needed
+        self._player_table = None
+
+    @property
+    def player_table(self):
+        """
+        Columnar PlayerTable of the player pool, with one row per player.
+        """
+        player_pool = self.player_pool  # Loads the pool, and with it the table, in lazy mode
+        if self._player_table is None:
+            self._player_table = PlayerTable.from_players(player_pool.values())
+        return self._player_table
+
+    @property
+    def season_hitting(self):
+        if self._season_hitting is None:
+            self._load_season_statistics()
+        return self._season_hitting
+
+    @season_hitting.setter
+    def season_hitting(self, season_hitting):
+        self._season_hitting = season_hitting
+
+    @property
+    def season_pitching(self):
+        if self._season_pitching is None:
+            self._load_season_statistics()
+        return self._season_pitching
+
+    @season_pitching.setter
+    def season_pitching(self, season_pitching):
+        self._season_pitching = season_pitching
+
+    def _load_teams(self):
+        """
+        Lazily loads the teams from the mTeam view.  Rosters are only fetched and linked if the player pool is
+        already loaded; otherwise that happens when the player pool is loaded.
+        :return: None
+        """
+        self._teams = []
+        if self._player_pool is None:
+            self.update_teams(rosters_json=[])
+        else:
+            self.update_teams()
+
+    def _load_player_pool(self):
+        """
+        Lazily loads the player pool and, if the teams are already loaded, links their rosters to it.
+        :return: None
+        """
+        self._player_pool = PlayerPool()
         self.update_player_pool()
-        self.update_teams()
+        if self._teams is not None:
+            self._link_rosters(self.req.get_rosters())
+
+    def _load_season_statistics(self):
+        """
+        Lazily builds the season statistics DataFrames from the teams (mTeam view only).
+        :return: None
+        """
+        self._season_hitting = pd.DataFrame()
+        self._season_pitching = pd.DataFrame()
         self.update_season_statistics()
 
-    def update_teams(self):
+    def _require_rosters(self):
+        """
+        Makes sure team rosters are linked to Player objects, which in lazy mode requires the player pool.
+        :return: None
+        """
+        if self._player_pool is None:
+            self._load_player_pool()
+
+    def _load(self):
+        """
+        Fetches the league settings, player pool and teams.
+        :return: None
+        """
+        # mSettings, mMatchupScore, mTeam and mRoster are requested together; the payload carries the settings,
+        # status, schedule and teams
+        bootstrap = self.req.get_league_bootstrap()
+        teams_json = bootstrap.get("teams") if bootstrap else None
+        self.get_league_info(bootstrap)
+        self.update_player_pool()
+        self.update_teams(teams_json, teams_json)
+        self.update_season_statistics()
+
+    def update_teams(self, teams_json=None, rosters_json=None):
         """
         Initializes and adds a new Team object for each team in the league,
         and adds it to the teams attribute for the League.
+        :param teams_json: Optional list of mTeam team JSON.  Fetched when omitted.
+        :param rosters_json: Optional list of mRoster team JSON.  Fetched when omitted.  Rosters are matched to
+                             teams by team id.
         """
-        data = self.req.get_teams()
-        roster_data = self.req.get_rosters()
+        data = teams_json if teams_json is not None else self.req.get_teams()
+        if not data:
+            return
+        roster_data = rosters_json if rosters_json is not None else self.req.get_rosters()
         self.teams.clear()
-        team_quantity = len(data)
-        for i in range(1, team_quantity + 1):
-            team_data = data[i - 1]
-            roster_json = roster_data[i-1]
-            new_team = Team(team_json=team_data)  # Initialize Team with roster data
-            new_team.update_roster(self.player_pool, roster_json)
-            self.teams.append(new_team)
+        for team_data in data:
+            self.teams.append(Team(team_json=team_data))
+        self._link_rosters(roster_data)
+
+    def _link_rosters(self, rosters_json):
+        """
+        Points each team's current roster at the Player objects of the player pool.
+        :param rosters_json: List of mRoster team JSON, matched to teams by team id.
+        :return: None
+        """
+        rosters_by_team_id = {roster_json["id"]: roster_json for roster_json in rosters_json or []}
+        # In lazy mode the pool may not be loaded yet; the rosters are linked again once it is
+        player_pool = self._player_pool if self._player_pool is not None else PlayerPool()
+        for team in self._teams:
+            team.update_roster(player_pool, rosters_by_team_id.get(team.team_id, {}))
 
     def update_season_statistics(self):
         """
@@ -51,45 +209,215 @@ class League:
             self.season_hitting = pd.concat([self.season_hitting, team.season_hitting], ignore_index=True)
             self.season_pitching = pd.concat([self.season_pitching, team.season_pitching], ignore_index=True)
 
-    def update_daily_statistics(self, scoring_period_id: int):
+    def update_daily_statistics(self, scoring_period_id: int, long_format: bool = False):
         """
         Gets statistics for players in active roster spots for every team roster in the specified scoring period.
         :param scoring_period_id: The scoring period for which statistics will be gathered.
+        :param long_format: Return long frames with one row per non-zero stat.  See parse_daily_statistics.
         :return: A DataFrame containing the league statistics for the scoring period.
         """
         league_roster_json = self.req.get_daily_stats(scoring_period_id=scoring_period_id)
-        hitting_df = pd.DataFrame()
-        pitching_df = pd.DataFrame()
+        return self.parse_daily_statistics(league_roster_json, long_format)
+
+    def parse_daily_statistics(self, league_roster_json, long_format: bool = False):
+        """
+        Parses the mRoster JSON of a single scoring period into hitting and pitching DataFrames.
+        :param league_roster_json: The list of team JSON returned by ESPNRequester.get_daily_stats.  Teams missing
+                                   from it have no rows.
+        :param long_format: If True the frames are long, with one row per non-zero stat (see
+                            Team.get_daily_stats_long), instead of one column per stat.  pivot_daily_stats turns them
+                            back into the wide layout.
+        :return: A tuple of hitting and pitching DataFrames for the scoring period, with compact dtypes.
+        """
+        hitting_frames = []
+        pitching_frames = []
+        # Rosters are matched to teams by team id, since the response need not list teams in the same order
+        rosters_by_team_id = {roster_json["id"]: roster_json for roster_json in league_roster_json}
         for team in self.teams:
-            team_roster_json = league_roster_json[self.teams.index(team)]["roster"]["entries"]
-            hitting, pitching = team.get_daily_stats(team_roster_json)
-            hitting_df = pd.concat([hitting_df, hitting], ignore_index=True)
-            pitching_df = pd.concat([pitching_df, pitching], ignore_index=True)
-        return hitting_df, pitching_df
+            if team.team_id not in rosters_by_team_id:
+                continue
+            team_roster_json = rosters_by_team_id[team.team_id]["roster"]["entries"]
+            if long_format:
+                hitting, pitching = team.get_daily_stats_long(team_roster_json, self.matchup_period_lookup)
+            else:
+                hitting, pitching = team.get_daily_stats(team_roster_json, self.matchup_period_lookup)
+            hitting_frames.append(hitting)
+            pitching_frames.append(pitching)
+        return concat_daily_frames(hitting_frames), concat_daily_frames(pitching_frames)
 
-    def get_all_daily_stats(self):
+    def get_all_daily_stats(self, workers: int = 1, max_in_flight: int = None, long_format: bool = False):
         """
         gets daily stats for the entire season and outputs the data as two separate dataframes
-        :return: A tuple of dataframes
-        """
-        hitting_df = pd.DataFrame()
-        pitching_df = pd.DataFrame()
-        for i in range(1, self.final_scoring_period + 1):
-            hitting, pitching = self.update_daily_statistics(i)
-            hitting_df = pd.concat([hitting_df, hitting], ignore_index=True)
-            pitching_df = pd.concat([pitching_df, pitching], ignore_index=True)
+        :param workers: Number of threads fetching scoring periods. 1 fetches the periods one after another.
+        :param max_in_flight: Maximum number of fetched but unparsed periods held at once.  Defaults to 2 * workers.
+        :param long_format: Return long frames with one row per non-zero stat.  See parse_daily_statistics.
+        :return: A tuple of dataframes with compact dtypes (see Team.compact_daily_frame).  Scoring periods that
+                 could not be fetched are left out and reported.
+        """
+        scoring_periods = range(1, self.final_scoring_period + 1)
+        daily_stats = {}
+        failed = []
+
+        def add_period(scoring_period_id, league_roster_json):
+            if not league_roster_json:
+                failed.append(scoring_period_id)
+                return
+            daily_stats[scoring_period_id] = self.parse_daily_statistics(league_roster_json, long_format)
+
+        if workers > 1:
+            self._get_daily_statistics_concurrently(scoring_periods, workers, max_in_flight, on_period=add_period)
+        else:
+            for i in scoring_periods:
+                add_period(i, self.req.get_daily_stats(scoring_period_id=i))
+        self._report_failed_periods(failed)
+        return self._combine_daily_statistics(daily_stats)
+
+    def pivot_daily_stats(self, hitting_long: pd.DataFrame, pitching_long: pd.DataFrame, hitting_categories=None,
+                          pitching_categories=None):
+        """
+        Rebuilds wide daily frames from long ones, with stat columns for the requested categories only.
+        See Team.pivot_daily_stats.
+        :param hitting_long: Long hitting frame, for instance from get_all_daily_stats(long_format=True).
+        :param pitching_long: Long pitching frame.
+        :param hitting_categories: Stat ids or names of HITTING_MAP.  Defaults to the league's hitting categories.
+        :param pitching_categories: Stat ids or names of PITCHING_MAP.  Defaults to the league's pitching categories.
+        :return: A tuple of hitting and pitching DataFrames with compact dtypes.
+        """
+        if hitting_categories is None:
+            hitting_categories = list(self.hitting_categories) or None
+        if pitching_categories is None:
+            pitching_categories = list(self.pitching_categories) or None
+        hitting_df = pivot_daily_stats(hitting_long, HITTING_MAP, hitting_categories)
+        pitching_df = pivot_daily_stats(pitching_long, PITCHING_MAP, pitching_categories)
         return hitting_df, pitching_df
 
-    def get_league_info(self):
+    @staticmethod
+    def _combine_daily_statistics(daily_stats: dict):
+        """
+        Concatenates per-period frames once, in scoring period order.
+        :param daily_stats: Dictionary of scoring period id to a tuple of hitting and pitching DataFrames.
+        :return: A tuple of hitting and pitching DataFrames with compact dtypes.
+        """
+        periods = sorted(daily_stats)
+        hitting_df = concat_daily_frames([daily_stats[i][0] for i in periods])
+        pitching_df = concat_daily_frames([daily_stats[i][1] for i in periods])
+        return hitting_df, pitching_df
+
+    @staticmethod
+    def _report_failed_periods(failed: list):
+        """
+        Warns about scoring periods whose statistics could not be fetched.
+        :param failed: List of scoring period ids.
+        :return: None
+        """
+        if failed:
+            print(f"⚠️ Could not fetch scoring periods {sorted(failed)}; their statistics are not included")
+
+    def sync_daily_stats(self, store, workers: int = 1, max_in_flight: int = None):
+        """
+        Brings a DailyStatsStore up to date and returns the stored daily stats of the season.
+        Only scoring periods that are not stored yet, or that were still in progress when they were stored, are
+        fetched.  Periods after the current scoring period have no statistics and are skipped.
+        :param store: A daily_store.DailyStatsStore.
+        :param workers: Number of threads fetching scoring periods.  See get_all_daily_stats.
+        :param max_in_flight: Maximum number of fetched but unparsed periods.  See get_all_daily_stats.
+        :return: A tuple of hitting and pitching DataFrames ordered by scoring period, with compact dtypes.
+        """
+        last_period = self.final_scoring_period
+        if self.current_scoring_period is not None:
+            last_period = min(last_period, self.current_scoring_period)
+        complete = store.complete_periods(self.league_id, self.season_id)
+        scoring_periods = [i for i in range(1, last_period + 1) if i not in complete]
+        failed = []
+
+        def save_period(scoring_period_id, league_roster_json):
+            # Each period is stored as soon as it is parsed, so a failure later in the sync loses nothing
+            if not league_roster_json:
+                failed.append(scoring_period_id)
+                return
+            hitting, pitching = self.parse_daily_statistics(league_roster_json)
+            store.save_period(self.league_id, self.season_id, scoring_period_id, hitting, pitching,
+                              self.req.is_complete(scoring_period_id))
+
+        if workers > 1:
+            self._get_daily_statistics_concurrently(scoring_periods, workers, max_in_flight, on_period=save_period)
+        else:
+            for i in scoring_periods:
+                save_period(i, self.req.get_daily_stats(scoring_period_id=i))
+        if failed:
+            print(f"⚠️ Could not fetch scoring periods {sorted(failed)}; they are fetched again on the next sync")
+        hitting_df, pitching_df = store.load(self.league_id, self.season_id)
+        return compact_daily_frame(hitting_df), compact_daily_frame(pitching_df)
+
+    def _get_daily_statistics_concurrently(self, scoring_periods, workers: int, max_in_flight: int = None,
+                                           long_format: bool = False, on_period=None):
+        """
+        Fetches scoring periods on a thread pool and parses each period on the calling thread as soon as it arrives.
+        At most max_in_flight requests are submitted or waiting to be parsed at any time.
+        :param scoring_periods: Iterable of scoring period ids to fetch.
+        :param workers: Number of fetching threads.
+        :param max_in_flight: Maximum number of outstanding periods.  Defaults to 2 * workers.
+        :param long_format: Parse the periods into long frames.  See parse_daily_statistics.
+        :param on_period: Optional function called on the calling thread with each scoring period id and its mRoster
+                          JSON (None if the request failed) as it arrives.  It replaces the default parsing, and the
+                          returned dictionary is then empty.
+        :return: A dictionary of scoring period id to a tuple of hitting and pitching DataFrames.
+        """
+        if max_in_flight is None:
+            max_in_flight = 2 * workers
+        max_in_flight = max(max_in_flight, 1)
+        daily_stats = {}
+        pending = {}
+
+        def parse_completed(done):
+            for future in done:
+                scoring_period_id = pending.pop(future)
+                if on_period is not None:
+                    on_period(scoring_period_id, future.result())
+                else:
+                    daily_stats[scoring_period_id] = self.parse_daily_statistics(future.result(), long_format)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            try:
+                for scoring_period_id in scoring_periods:
+                    if len(pending) >= max_in_flight:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        parse_completed(done)
+                    future = executor.submit(self.req.get_daily_stats, scoring_period_id=scoring_period_id)
+                    pending[future] = scoring_period_id
+                while pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    parse_completed(done)
+            except BaseException:
+                for future in pending:
+                    future.cancel()
+                raise
+        return daily_stats
+
+    def get_league_info(self, settings_json=None):
         """
         gathers league settings and stores them in attributes
         todo: add roster settings and scoring settings
+        :param settings_json: Optional mSettings and mMatchupScore JSON (such as the league bootstrap payload).
+                              Fetched when omitted.
         :return: None
         """
-        settings_json = self.req.get_league_settings()
+        if settings_json is None:
+            settings_json = self.req.get_league_settings()
         settings = settings_json.get("settings")
         self.final_scoring_period = int(settings_json["status"]["finalScoringPeriod"])
-        
+        self.current_scoring_period = settings_json["status"].get("latestScoringPeriod")
+        self.req.current_scoring_period = self.current_scoring_period
+        matchup_periods = schedule_matchup_periods(settings_json.get("schedule") or [])
+        if any(matchup_periods.values()):
+            # Raises a ValueError for a schedule that does not match the season's scoring periods
+            played_through = (self.current_scoring_period or 1) - 1
+            self.matchup_period_lookup = build_matchup_period_lookup(matchup_periods, self.final_scoring_period,
+                                                                     played_through)
+        else:
+            print("⚠️ The league schedule lists no scoring periods; Matchup Period is 0 in the daily stats")
+            self.matchup_period_lookup = [0]
+
         # Get scoring settings from league settings
         if "scoringSettings" in settings:
             scoring = settings["scoringSettings"]
@@ -108,37 +436,67 @@ class League:
                         elif 33 <= stat_id <= 66:
                             self.pitching_categories[stat_id] = is_reverse
 
-    def update_player_pool(self):
+    def update_player_pool(self, player_data=None):
         """
         Updates the player pool with all available players from ESPN
+        :param player_data: Optional iterable of kona_player_info player JSON.  Fetched when omitted, page by page
+                            if player_page_size is set.
         """
-        player_data = self.req.get_all_players()
+        if player_data is None:
+            if self.player_page_size:
+                player_data = self.req.iter_players(page_size=self.player_page_size)
+            else:
+                player_data = self.req.get_all_players()
         if not player_data:
             return
 
+        # Build the columnar table in one pass; the pool holds Player views over its rows.  The existing pool is
+        # only replaced once every page has arrived.
+        try:
+            player_table = PlayerTable.from_json(player_data)
+        except PlayerPageError as e:
+            print(f"⚠️ Error fetching the player pool, keeping the current one: {e}")
+            return
+        if not len(player_table):
+            print("⚠️ No players received, keeping the current player pool")
+            return
+        self._player_table = player_table
+
         # Clear existing player pool
         self.player_pool.clear()
 
         # Create a map of team IDs to team names for easier lookup
-        team_map = {team.team_id: team.name for team in self.teams}
+        team_map = {team.team_id: team.name for team in self._teams or []}
 
-        # Process each player
-        for player_json in player_data:
-            player = Player(player_json)
-            
-            # Get player's fantasy team info if they're on a roster
-            if "onTeamId" in player_json:
-                player.team_id = player_json["onTeamId"]
+        # Process each player.  Team id and waiver status come from the table; free agents have no team id.
+        for player in self._player_table.players():
+            if player.team_id:
                 player.fantasy_team = team_map.get(player.team_id, "Unknown")
             else:
-                player.fantasy_team = "Free Agent"
-            
-            # Get waiver status
-            player.waiver_status = player_json.get("waiverStatus", {}).get("status", "NONE")
+                player.fantasy_team = FREE_AGENT
             
-            # Store player in pool
+            # Store player in pool, which indexes it by team, status, position and pro team
             self.player_pool[player.player_id] = player
 
+    def load_player_projections(self, path: str = 'kona_player_info.json'):
+        """
+        Replaces the player pool with the players of a local kona_player_info.json file, streamed one player at a
+        time into the player table (see ESPNRequester.iter_player_projections).  compile_player_projections_df and
+        the other projection methods then use the file's projections.
+        :param path: Path of the file.  The current player pool is kept if the file is missing, invalid or truncated.
+        :return: None
+        """
+        previous_table = self._player_table
+        try:
+            self.update_player_pool(self.req.iter_player_projections(path))
+        except ValueError as e:
+            # Raised while the table is built, before the current pool is touched
+            print(f"⚠️ Error decoding {path}, keeping the current player pool: {e}")
+            return
+        if self._player_table is not previous_table and self._teams is not None:
+            # Point the rosters at the new Player objects
+            self._link_rosters(self.req.get_rosters())
+
     def get_player_by_id(self, player_id):
         """
         Get a player from the player pool by their ID
@@ -149,19 +507,29 @@ class League:
         """
         Get all players on a specific fantasy team
         """
-        return [player for player in self.player_pool.values() if player.team_id == team_id]
+        return self.player_pool.by_team(team_id)
 
     def get_free_agents(self):
         """
         Get all free agent players
         """
-        return [player for player in self.player_pool.values() if player.fantasy_team == "Free Agent"]
+        return self.player_pool.free_agents()
 
     def get_players_on_waivers(self):
         """
         Get all players on waivers
         """
-        return [player for player in self.player_pool.values() if player.waiver_status != "NONE"]
+        return self.player_pool.on_waivers()
+
+    def find_players(self, team_id=None, free_agent: bool = None, on_waivers: bool = None, position_id=None,
+                     slot=None, pro_team_id=None):
+        """
+        Get the players matching every given filter, for instance free agent shortstops with
+        find_players(free_agent=True, slot=4).  See PlayerPool.query.
+        :return: List of Player
+        """
+        return self.player_pool.query(team_id=team_id, free_agent=free_agent, on_waivers=on_waivers,
+                                      position_id=position_id, slot=slot, pro_team_id=pro_team_id)
 
     def get_team_projections(self):
         """
@@ -169,6 +537,7 @@ class League:
         Returns a DataFrame with team projections.
         """
         projections = []
+        self._require_rosters()
 
         for team in self.teams:
             team_proj = {
@@ -183,7 +552,6 @@ class League:
             # Iterate over the actual Player objects in the team's roster
             # (Assuming update_roster stores them in team.current_roster as a dict)
             for player in team.current_roster.values():
-                print(player.default_position_id)
                 if player.default_position_id <= 12:  # Hitter
                     for cat in hitting_totals:
                         hitting_totals[cat] += player.get_weighted_projection(cat)
@@ -197,6 +565,100 @@ class League:
 
         return pd.DataFrame(projections)
 
+    def simulate_season(self, simulations: int = 10000, workers: int = 1, seed=None, scale: float = 1.0,
+                        playing_time_cv: float = 0.2):
+        """
+        Simulates the standings of the current rosters from the players' projections.  See
+        simulation.SeasonSimulator.
+        :param simulations: Number of simulated seasons.
+        :param workers: Number of processes the simulations are split across.
+        :param seed: Seed for reproducible results.
+        :param scale: Fraction of the projected season to simulate.  Use the share of one matchup period to get
+                      head-to-head win probabilities for a single matchup.
+        :param playing_time_cv: Coefficient of variation of each player's playing time.
+        :return: A tuple of a DataFrame of the probability of each team (rows) finishing in each roto place
+                 (columns, 1 is first) and a DataFrame of the probability of the row team winning a head-to-head
+                 category matchup against the column team, with ties counted as half a win.
+        """
+        self._require_rosters()
+        table = self.player_table
+        categories = {**self.hitting_categories, **self.pitching_categories}
+        stat_ids = component_stats(categories)
+
+        player_ids, owners = [], []
+        for team_index, team in enumerate(self.teams):
+            for player_id in team.current_roster:
+                player_ids.append(player_id)
+                owners.append(team_index)
+        rows = table.select(player_ids)
+        means = projection_means(table.projections.to_numpy()[rows], list(table.projections.columns), stat_ids)
+        ownership = np.zeros((len(self.teams), len(player_ids)))
+        ownership[owners, np.arange(len(player_ids))] = 1
+
+        simulator = SeasonSimulator(means, ownership, categories, stat_ids, playing_time_cv, scale)
+        places, h2h = simulator.run(simulations, workers=workers, seed=seed)
+        team_names = [team.name for team in self.teams]
+        place_df = pd.DataFrame(places, index=team_names, columns=range(1, len(team_names) + 1))
+        h2h_df = pd.DataFrame(h2h, index=team_names, columns=team_names)
+        return place_df, h2h_df
+
+    def get_roster_evaluator(self):
+        """
+        Builds a RosterEvaluator over the projections of the whole player pool, with the current rosters as its
+        starting point.  Keep it to evaluate many moves against the same cached totals; apply accepted moves to it.
+        :return: roster_evaluator.RosterEvaluator
+        """
+        self._require_rosters()
+        table = self.player_table
+        categories = {**self.hitting_categories, **self.pitching_categories}
+        stat_ids = component_stats(categories)
+        means = projection_means(table.projections.to_numpy(), list(table.projections.columns), stat_ids)
+        player_ids = [record[0] for record in table.records]
+        owners = {player_id: team.team_id for team in self.teams for player_id in team.current_roster}
+        return RosterEvaluator(means, player_ids, [owners.get(player_id) for player_id in player_ids],
+                               [team.team_id for team in self.teams], categories, stat_ids)
+
+    def evaluate_moves(self, moves: dict, evaluator: RosterEvaluator = None):
+        """
+        Projects the roto points of every team after a trade or add/drop.
+        :param moves: Dictionary of team id to a tuple of the player ids the team adds and the player ids it drops,
+                      for instance {1: ([a], [b]), 2: ([b], [a])} for a trade of a for b.
+        :param evaluator: RosterEvaluator to reuse.  Built from the current rosters when omitted.
+        :return: DataFrame with each team's total points before and after the moves and the change.
+        """
+        if evaluator is None:
+            evaluator = self.get_roster_evaluator()
+        _, points = evaluator.evaluate(moves)
+        before = evaluator.total_points
+        after = points.sum(axis=-1)
+        team_names = {team.team_id: team.name for team in self.teams}
+        return pd.DataFrame({"Team ID": evaluator.team_ids,
+                             "Team Name": [team_names.get(team_id) for team_id in evaluator.team_ids],
+                             "Points Before": before, "Points After": after, "Change": after - before})
+
+    def rank_free_agents(self, team_id, drop_player_id=None, slot=None, evaluator: RosterEvaluator = None):
+        """
+        Ranks every free agent by the team's projected roto points with that free agent added, in one batch.
+        :param team_id: Team id of the team adding a player.
+        :param drop_player_id: Player id of the rostered player the free agent would replace, or None to only add.
+        :param slot: Optional lineup slot id (see POSITION_MAP) the free agents must be eligible for.
+        :param evaluator: RosterEvaluator to reuse.  Built from the current rosters when omitted.
+        :return: DataFrame of free agents sorted by Total Points, with the points of each category and the Change
+                 of total points from the current roster.
+        """
+        if evaluator is None:
+            evaluator = self.get_roster_evaluator()
+        free_agents = self.find_players(free_agent=True, slot=slot)
+        candidate_ids = [player.player_id for player in free_agents]
+        _, points = evaluator.score_candidates(team_id, candidate_ids, drop_player_id)
+
+        df = pd.DataFrame(points, columns=[f"{name} Points" for name in category_names(evaluator.categories)])
+        df.insert(0, "Player ID", candidate_ids)
+        df.insert(1, "Player Name", [player.full_name for player in free_agents])
+        df["Total Points"] = points.sum(axis=-1)
+        df["Change"] = df["Total Points"] - evaluator.total_points[evaluator.team_index[team_id]]
+        return df.sort_values("Total Points", ascending=False, kind="stable").reset_index(drop=True)
+
     def get_roto_standings(self, team_df):
         """
         Compute roto standings from a team projections DataFrame.
@@ -205,7 +667,7 @@ class League:
           - team_df contains identifier columns "Team" and "Team ID".
           - All other columns are stat categories keyed by stat IDs (as numbers or numeric strings).
           - self.hitting_categories and self.pitching_categories are dictionaries keyed by stat ID (int)
-            with boolean values indicating whether a higher value is better (True) or lower is better (False).
+            with ESPN's isReverseItem as values: True when a lower value is better.
           - HITTING_MAP and PITCHING_MAP (from your constants) are used to convert a stat ID to a human‐readable name.
 
         The function partitions stat columns into hitting and pitching, computes a rank for each stat
@@ -246,11 +708,11 @@ class League:
                 stat_id = int(col)
             except Exception:
                 continue
-            # Determine if higher is better.
+            # Determine if higher is better.  The category dictionaries hold isReverseItem, True when lower is better.
             if stat_id in self.hitting_categories:
-                higher_is_better = self.hitting_categories[stat_id]
+                higher_is_better = not self.hitting_categories[stat_id]
             elif stat_id in self.pitching_categories:
-                higher_is_better = self.pitching_categories[stat_id]
+                higher_is_better = not self.pitching_categories[stat_id]
             else:
                 higher_is_better = True  # default assumption
 
@@ -276,6 +738,28 @@ class League:
 
         return roto_df
 
+    def get_roto_standings_series(self, hitting_df: pd.DataFrame = None, pitching_df: pd.DataFrame = None):
+        """
+        Computes the roto standings after every scoring period of the season in one vectorized pass over the
+        team x scoring period x category cube.  Rate categories are computed from cumulative components and the
+        ranking direction of each category comes from hitting_categories and pitching_categories.
+        See roto.roto_standings_series.
+        :param hitting_df: Daily hitting DataFrame.  Both frames are fetched with get_all_daily_stats when omitted.
+        :param pitching_df: Daily pitching DataFrame.
+        :return: DataFrame indexed by Scoring Period and Team ID with a Team Name column, each category's value and
+                 points, and Total Points.
+        """
+        if hitting_df is None or pitching_df is None:
+            hitting_df, pitching_df = self.get_all_daily_stats()
+        categories = {**self.hitting_categories, **self.pitching_categories}
+        stat_ids = component_stats(categories)
+        cube, team_ids, scoring_periods = build_daily_cube(hitting_df, pitching_df, stat_ids,
+                                                           [team.team_id for team in self.teams])
+        standings = roto_standings_series(cube, team_ids, scoring_periods, stat_ids, categories)
+        team_names = {team.team_id: team.name for team in self.teams}
+        standings.insert(0, "Team Name", standings.index.get_level_values("Team ID").map(team_names))
+        return standings
+
     def get_all_rosters(self):
         """
         Compiles a DataFrame of all team rosters.
@@ -291,39 +775,48 @@ class League:
         Compiles a DataFrame with projection stats for each player on every team.
         Each row represents one player and includes basic info and projection values.
 
-        Assumes that each team object has a 'current_roster' attribute that is a dictionary
-        of Player objects, and that each Player has its projections stored in player.projections.
+        Rows are taken from the columnar player_table for the players of each team's current_roster, so
+        projections are sliced as one block instead of being merged player by player.  Stat columns are in stat
+        id order and only include stats at least one rostered player has.  Call load_player_projections first to
+        use the projections of a local kona_player_info.json file.
         """
         # Use a logger to help with debugging in case any player is missing projections.
         logger = logging.getLogger(__name__)
-        rows = []
+        self._require_rosters()
+        table = self.player_table
 
+        player_ids, team_ids, team_names = [], [], []
         for team in self.teams:
-            # Loop over each player in the team's current roster.
-            for player in team.current_roster.values():
-                # Start with basic information
-                row = {
-                    "Player ID": player.player_id,
-                    "Player Name": player.full_name,
-                    "Team ID": team.team_id,
-                    "Team Name": team.name,
-                    "Default Position ID": player.default_position_id
-                }
-                # Merge in the player's projection stats, if available.
-                # If projections are missing, log a warning.
-                if player.projections:
-                    # player.projections is assumed to be a dictionary, so update the row.
-                    row.update(player.projections)
-                else:
-                    logger.warning("Player %s (ID: %s) has no projections.", player.full_name, player.player_id)
-
-                rows.append(row)
-
-        # Create and return the DataFrame
-        df = pd.DataFrame(rows)
-        return df
-
-    def group_projections_by_team(self, rename_stats=True):
+            for player_id in team.current_roster:
+                player_ids.append(player_id)
+                team_ids.append(team.team_id)
+                team_names.append(team.name)
+        if not player_ids:
+            return pd.DataFrame()
+
+        rows = table.select(player_ids)
+        info = table.info.iloc[rows].reset_index(drop=True)
+        projections = table.projections.iloc[rows].reset_index(drop=True)
+        # Keep the stats some player has, as integers where no player is missing them
+        present = projections.notna()
+        projections = projections.loc[:, present.any()]
+        complete = present.all()
+        projections = projections.astype({stat_id: "int64" for stat_id in complete[complete].index
+                                          if stat_id in projections.columns})
+
+        for row in np.flatnonzero(~present.any(axis=1).to_numpy()):
+            logger.warning("Player %s (ID: %s) has no projections.", info["Player Name"][row], player_ids[row])
+
+        df = pd.DataFrame({
+            "Player ID": player_ids,
+            "Player Name": info["Player Name"],
+            "Team ID": team_ids,
+            "Team Name": team_names,
+            "Default Position ID": _plain_integers(info["Default Position ID"])
+        })
+        return pd.concat([df, projections], axis=1)
+
+    def group_projections_by_team(self, rename_stats=True, csv_path=None):
         """
         Group player projections by team and aggregate stats.
 
@@ -343,104 +836,70 @@ class League:
         Aggregation rules:
           - Counting stats: Sum the stat over the group and then divide by the number of players
             in the subgroup (hitters or pitchers).
-          - Rate stats: Compute a weighted average using the appropriate playing time column
-            (using "PA" for hitters and "IP" for pitchers).
+          - Rate stats: Computed from the summed components (for instance OBP from H, BB, HBP, AB and SF).
 
+        Every team's sums are computed in one groupby over team and hitter/pitcher.  See
+        project_roster_scenarios for hypothetical rosters.
+        :param rename_stats: Name the category columns instead of using stat ids.
+        :param csv_path: Optional path the player projections are written to.
         Returns:
           A DataFrame with one row per team that includes aggregated stats.
         """
         # Gather projections
         projections_df = self.compile_player_projections_df()
-
-        # Define which positions are considered pitchers
-        pitcher_ids = {1, 11}
-
-        # Define stat categories for hitters
-        hitter_cats = self.hitting_categories
-        projections_df.to_csv('player_projections.csv')
-        hitter_counting = [5, 20, 21, 23]
-        hitter_rate = [9, 17]
-
-        # Define stat categories for pitchers
-        pitcher_cats = self.pitching_categories
-        pitcher_counting = [34, 48, 53, 57, 63]
-        pitcher_rate = [41, 47]
-
-        # Group the DataFrame by team
-        team_groups = projections_df.groupby(["Team ID", "Team Name"])
-        team_rows = []
-
-        # Loop through each team group
-        for (team_id, team_name), group in team_groups:
-            team_data = {"Team ID": team_id, "Team Name": team_name}
-
-            # Separate hitters and pitchers using the default position id
-            hitters = group[~group["Default Position ID"].isin(pitcher_ids)]
-            pitchers = group[group["Default Position ID"].isin(pitcher_ids)]
-
-            # --- Aggregate Hitting Stats ---
-            n_hitters = len(hitters)
-            # Counting stats: sum and average (sum divided by count)
-            for stat in hitter_cats:
-                if stat in hitter_counting:
-                    if stat in hitters.columns:
-                        total = hitters[stat].sum()
-                        team_data[stat] = total / n_hitters if n_hitters > 0 else None
-                    else:
-                        team_data[stat] = None
-
-            # Rate stats: weighted average using hitter weight (PA)
-                elif stat in hitter_rate:
-                    if stat == 9:
-                        slg = hitters[8].sum() / hitters[0].sum()
-                        team_data[stat] = slg
-                    elif stat == 17:
-                        num = hitters[1].sum() + hitters[10].sum() + hitters[12].sum()
-                        denom = hitters[0].sum() + hitters[10].sum() + hitters[12].sum() + hitters[13].sum()
-                        obp = num / denom
-                        team_data[stat] = obp
-                    else:
-                        team_data[stat] = None
-
-            # Optionally include average playing time for hitters
-            # team_data["Average PA"] = hitters[hitter_weight].mean() if (
-                        # hitter_weight in hitters.columns and n_hitters > 0) else None
-
-            # --- Aggregate Pitching Stats ---
-            n_pitchers = len(pitchers)
-            # Counting stats: sum then average
-            for stat in pitcher_cats:
-                if stat in pitcher_counting:
-                    if stat in pitchers.columns:
-                        total = pitchers[stat].sum()
-                        team_data[stat] = total / n_pitchers if n_pitchers > 0 else None
-                    else:
-                        team_data[stat] = None
-
-            # Rate stats: weighted average using pitcher weight (IP)
-                elif stat in pitcher_rate:
-                    if stat == 41:
-                        whip = (pitchers[39].sum() + pitchers[37].sum()) / (pitchers[34].sum() / 3)
-                        team_data[stat] = whip
-                    elif stat == 47:
-                        era = pitchers[45].sum() / (pitchers[34].sum() / 27)
-                        team_data[stat] = era
-                    else:
-                        team_data[stat] = None
-
-            # Optionally add counts for debugging or further analysis
-            # team_data["Total Players"] = len(group)
-            # team_data["Hitters Count"] = n_hitters
-            # team_data["Pitchers Count"] = n_pitchers
-
-            team_rows.append(team_data)
-
-        df = pd.DataFrame(team_rows)
+        if csv_path is not None:
+            projections_df.to_csv(csv_path)
+
+        categories = projected_categories(self.hitting_categories, self.pitching_categories)
+        stat_ids = [column for column in projections_df.columns if isinstance(column, (int, np.integer))]
+        is_pitcher = projections_df["Default Position ID"].isin(PITCHER_POSITION_IDS).rename("Pitcher")
+
+        # One pass: sums and player counts per team, split into hitters and pitchers
+        grouped = projections_df.groupby(["Team ID", "Team Name", is_pitcher])
+        sums = grouped[stat_ids].sum().unstack("Pitcher", fill_value=0)
+        counts = grouped.size().unstack("Pitcher", fill_value=0).reindex(columns=[False, True], fill_value=0)
+        sums = sums.reindex(columns=pd.MultiIndex.from_product([stat_ids, [False, True]]), fill_value=0)
+        hitter_totals = sums.xs(False, axis=1, level=-1).to_numpy(dtype=np.float64)
+        pitcher_totals = sums.xs(True, axis=1, level=-1).to_numpy(dtype=np.float64)
+
+        values = team_category_values(hitter_totals, counts[False].to_numpy(dtype=np.float64), pitcher_totals,
+                                      counts[True].to_numpy(dtype=np.float64), stat_ids, categories)
+        df = pd.DataFrame(values, columns=categories)
+        df.insert(0, "Team ID", sums.index.get_level_values("Team ID"))
+        df.insert(1, "Team Name", sums.index.get_level_values("Team Name"))
 
         if rename_stats:
-            df.rename(
-                columns=lambda col: ({**HITTING_MAP, **PITCHING_MAP}).get(int(col)) if str(col).isdigit() and int(col) in {
-                    **HITTING_MAP, **PITCHING_MAP} else col, inplace=True)
-
-        # Convert the list of dictionaries into a DataFrame
+            df.rename(columns={**HITTING_MAP, **PITCHING_MAP}, inplace=True)
         return df
+
+    def project_roster_scenarios(self, ownership, player_ids, rename_stats=True):
+        """
+        Computes team projections for many hypothetical roster assignments at once, with the aggregation rules of
+        group_projections_by_team.
+        :param ownership: scenarios x players array of the team id owning each player in each scenario, 0 for
+                          players on no team.
+        :param player_ids: Player id of each column of ownership.  Players must be in the player pool.
+        :param rename_stats: Name the category columns instead of using stat ids.
+        :return: DataFrame indexed by Scenario and Team ID with one column per category.  Its values reshape to a
+                 scenarios x teams x categories array with to_numpy().reshape(len(ownership), len(teams), -1).
+        """
+        table = self.player_table
+        categories = projected_categories(self.hitting_categories, self.pitching_categories)
+        rows = table.select(list(player_ids))
+        stat_ids = list(table.projections.columns)
+        player_stats = np.nan_to_num(table.projections.to_numpy()[rows], nan=0.0)
+        positions = table.info["Default Position ID"].to_numpy()[rows]
+        is_pitcher = np.isin(positions, list(PITCHER_POSITION_IDS))
+        team_ids = [team.team_id for team in self.teams]
+
+        ownership = np.atleast_2d(ownership)
+        values = scenario_team_values(player_stats, is_pitcher, ownership, team_ids, stat_ids, categories)
+        index = pd.MultiIndex.from_product([range(len(ownership)), team_ids], names=["Scenario", "Team ID"])
+        columns = [{**HITTING_MAP, **PITCHING_MAP}[stat_id] for stat_id in categories] if rename_stats else categories
+        return pd.DataFrame(values.reshape(-1, len(categories)), index=index, columns=columns)
+
+def _plain_integers(series: pd.Series):
+    """
+    Converts a nullable Int64 column to int64, or to float64 with NaN if it has missing values.
+    """
+    return series.astype("float64" if series.hasnans else "int64")
@@ -1,14 +1,97 @@
 from espn_constant import DEFAULT_POSITION_ID_MAP, HITTING_MAP, PITCHING_MAP, FIELDING_MAP
+from array import array
+from collections.abc import Mapping
 import math
 
 
+# Id of the ESPN projection split (statSourceId 1) used for Player.projections
+PROJECTION_SPLIT_ID = "102025"
+
+
+class StatLine(Mapping):
+    """
+    Read-only mapping of stat id to value stored as a float32 array indexed by stat id, instead of a dict of
+    int keys.  Missing stats are stored as NaN and are not part of the mapping.  Values are ints, as produced by
+    the previous dict representation.
+
+    The stats dictionary is only converted on first access, so splits that are never read cost nothing to parse.
+    """
+    __slots__ = ("_stats", "_array")
+
+    def __init__(self, stats: dict = None):
+        """
+        :param stats: Dictionary of stat id to value.  Keys and values may be strings, as found in ESPN JSON.
+                      Infinite values are stored as 0; non-numeric keys and values are skipped.
+        """
+        self._stats = stats
+        self._array = None
+
+    @property
+    def _values(self):
+        if self._array is None:
+            self._array = self._convert(self._stats)
+            self._stats = None
+        return self._array
+
+    @staticmethod
+    def _convert(stats):
+        converted = {}
+        for k, v in (stats or {}).items():
+            try:
+                key = int(k)
+                value = float(v)
+                converted[key] = 0 if math.isinf(value) else int(value)
+            except (ValueError, TypeError, OverflowError):
+                continue
+        size = max(converted) + 1 if converted else 0
+        values = array("f", [math.nan]) * size
+        for key, value in converted.items():
+            values[key] = value
+        return values
+
+    def __getitem__(self, stat_id):
+        try:
+            value = self._values[stat_id]
+        except (IndexError, TypeError):
+            raise KeyError(stat_id)
+        if value != value:  # NaN marks a missing stat
+            raise KeyError(stat_id)
+        return int(value)
+
+    def __iter__(self):
+        return (stat_id for stat_id, value in enumerate(self._values) if value == value)
+
+    def __len__(self):
+        return sum(1 for value in self._values if value == value)
+
+    def __repr__(self):
+        return f"StatLine({dict(self)})"
+
+
 class Player:
-    def __init__(self, player_json):
+    # Players are created for every entry of the player pool, so instances use slots instead of a __dict__
+    __slots__ = ("_other_stats", "_season_stats_placeholder", "_projections_placeholder", "_raw_data", "_stats_json",
+                 "player_id", "full_name", "active", "default_position_id", "pro_team_id", "injury_status",
+                 "ownership", "eligible_slots", "team_id", "fantasy_team", "waiver_status", "_projections",
+                 "_projected_pa", "_projected_ip", "_season_stats", "_table", "_row")
+
+    def __init__(self, player_json, keep_raw=False):
+        """
+        :param player_json: Player JSON from the kona_player_info or mRoster views.
+        :param keep_raw: Keep player_json reachable through player_data and fantasy_data after parsing.  By default
+                         it is released once parsed to save memory; only its unparsed "stats" list is kept, and it
+                         is parsed on the first access of a stat attribute.
+        """
         # Store raw JSON data
-        self.other_stats = None
-        self.season_stats_placeholder = None
-        self.projections_placeholder = None
+        self._other_stats = None
+        self._season_stats_placeholder = None
+        self._projections_placeholder = None
         self._raw_data = player_json
+        # Unparsed stat splits, classified by _parse_stats on the first access of a stat attribute
+        self._stats_json = None
+        # PlayerTable and row the stats are read from instead, for players created by from_table
+        self._table = None
+        self._row = None
 
         # Initialize attributes
         self.player_id = None
@@ -22,21 +105,84 @@ class Player:
         self.team_id = None
         self.fantasy_team = None
         self.waiver_status = None
-        self.projections = None
-        self.projected_pa = None
-        self.projected_ip = None
-        self.season_stats = None
+        self._projections = None
+        self._projected_pa = None
+        self._projected_ip = None
+        self._season_stats = None
 
-        # Parse initial data
+        # Parse initial data.  Stats are parsed on demand from the stats list, which is all that is kept of the JSON.
         self._parse_basic_info()
         self._parse_fantasy_status()
-        self._parse_stats()
+        self._stats_json = self.player_data.get("stats") or None
+        if not keep_raw:
+            self._raw_data = None
+
+    def _stat_property(name):
+        """
+        Builds a property over the backing slot _<name> that parses the stat splits on first access.
+        """
+        slot = f"_{name}"
+
+        def getter(self):
+            if self._stats_json is not None or self._table is not None:
+                self._parse_stats()
+            return getattr(self, slot)
+
+        def setter(self, value):
+            # Parse first so that a later access does not overwrite the assigned value
+            if self._stats_json is not None or self._table is not None:
+                self._parse_stats()
+            setattr(self, slot, value)
+
+        return property(getter, setter)
+
+    projections = _stat_property("projections")
+    projected_pa = _stat_property("projected_pa")
+    projected_ip = _stat_property("projected_ip")
+    season_stats = _stat_property("season_stats")
+    projections_placeholder = _stat_property("projections_placeholder")
+    season_stats_placeholder = _stat_property("season_stats_placeholder")
+    other_stats = _stat_property("other_stats")
+    del _stat_property
+
+    @classmethod
+    def from_table(cls, table, row: int):
+        """
+        Creates a lightweight Player view over a row of a PlayerTable.  Its basic info and fantasy status are copied
+        from the table's info columns; projections and season_stats are read from the table on first access.
+        player_data and fantasy_data are None.
+        :param table: PlayerTable
+        :param row: Row position of the player in the table.
+        :return: Player
+        """
+        player = cls.__new__(cls)
+        (player.player_id, player.full_name, player.active, player.default_position_id, player.pro_team_id,
+         player.injury_status, player.ownership, player.eligible_slots, team_id, player.waiver_status) = \
+            table.records[row]
+        player._raw_data = None
+        player._stats_json = None
+        player._table = table
+        player._row = row
+        player._other_stats = None
+        player._season_stats_placeholder = None
+        player._projections_placeholder = None
+        player._projections = None
+        player._projected_pa = None
+        player._projected_ip = None
+        player._season_stats = None
+        player.team_id = team_id or None
+        player.fantasy_team = "Unknown" if player.team_id else "Free Agent"
+        if player.default_position_id is None:
+            print(f"Warning: Player {player.full_name} (ID: {player.player_id}) has no default_position_id. Skipping projection calculation.")
+        return player
 
     @property
     def player_data(self):
         """
-        Returns the core player data regardless of JSON nesting.
+        Returns the core player data regardless of JSON nesting, or None if the raw JSON was not kept.
         """
+        if self._raw_data is None:
+            return None
         if "playerPoolEntry" in self._raw_data:
             return self._raw_data["playerPoolEntry"]["player"]
         return self._raw_data["player"]
@@ -44,8 +190,10 @@ class Player:
     @property
     def fantasy_data(self):
         """
-        Returns the fantasy status data for the player.
+        Returns the fantasy status data for the player, or None if the raw JSON was not kept.
         """
+        if self._raw_data is None:
+            return None
         if "playerPoolEntry" in self._raw_data:
             return self._raw_data["playerPoolEntry"]
         return self._raw_data
@@ -87,80 +235,77 @@ class Player:
             self.fantasy_team = "Free Agent"
         self.waiver_status = data.get("waiverStatus", {}).get("status", "NONE")
 
-    import math
-
     def _parse_stats(self):
         """
-        Update all stats from the player's raw data.
+        Classify the player's stat splits.
         Stores projection stats, season stats, and any other stat entries as placeholders.
-        This version converts the keys from string to int while converting the values to ints (handling infinity).
+        Each stat split is stored as a StatLine keyed by integer stat id with int values (handling infinity), which
+        converts its stats when first read.
         """
-        data = self.player_data
-        if not data.get("stats"):
+        if self._table is not None:
+            self._read_table_stats()
+            return
+
+        stats_json = self._stats_json
+        if stats_json is None:
+            data = self.player_data
+            stats_json = data.get("stats") if data else None
+        self._stats_json = None
+        if not stats_json:
             return
 
         # Reset any previous stats
-        self.projections = {}
-        self.season_stats = {}
-        self.projections_placeholder = {}  # for other projection entries
-        self.season_stats_placeholder = []  # for non-primary season stat splits
-        self.other_stats = {}  # for any other stat sources
-
-        def convert_stats_keys(stats_dict):
-            """
-            Helper function to convert keys in stats_dict from strings to integers.
-            Also converts each value to int (via float conversion) and handles infinity.
-            """
-            converted = {}
-            for k, v in stats_dict.items():
-                try:
-                    # Convert key to an integer if possible.
-                    new_key = int(k)
-                except (ValueError, TypeError):
-                    new_key = k  # leave as-is if conversion fails
-
-                try:
-                    # Convert the value to float first (to handle strings like "123.0"), then to int.
-                    value = float(v)
-                    if math.isinf(value):
-                        converted[new_key] = 0
-                    else:
-                        converted[new_key] = int(value)
-                except (ValueError, TypeError, OverflowError):
-                    converted[new_key] = v
-            return converted
+        self._projections = {}
+        self._season_stats = {}
+        self._projections_placeholder = {}  # for other projection entries
+        self._season_stats_placeholder = []  # for non-primary season stat splits
+        self._other_stats = {}  # for any other stat sources
 
-        for stat in data["stats"]:
+        for stat in stats_json:
             stat_source = stat.get("statSourceId")
             stat_id = stat.get("id")
-            stats_dict = stat.get("stats", {})
-
-            # Convert the stat keys from string to int.
-            stats_dict = convert_stats_keys(stats_dict)
+            stats_dict = StatLine(stat.get("stats", {}))
 
             # For ESPN projections (statSourceId 1)
             if stat_source == 1:
-                if stat_id == "102025":
-                    self.projections = stats_dict
+                if stat_id == PROJECTION_SPLIT_ID:
+                    self._projections = stats_dict
                     if self.is_hitter:
-                        self.projected_pa = stats_dict.get("PA", 0)  # if "PA" exists as a key
+                        self._projected_pa = stats_dict.get("PA", 0)  # if "PA" exists as a key
                     else:
-                        self.projected_ip = stats_dict.get("IP", 0)  # if "IP" exists as a key
+                        self._projected_ip = stats_dict.get("IP", 0)  # if "IP" exists as a key
                 else:
-                    self.projections_placeholder[stat_id] = stats_dict
+                    self._projections_placeholder[stat_id] = stats_dict
 
             # For actual season stats (statSourceId 0)
             elif stat_source == 0:
                 if stat.get("statSplitTypeId") == 0:
-                    self.season_stats = stats_dict
+                    self._season_stats = stats_dict
                 else:
-                    self.season_stats_placeholder.append({
+                    self._season_stats_placeholder.append({
                         "id": stat_id,
                         "splitType": stat.get("statSplitTypeId"),
                         "stats": stats_dict
                     })
             else:
-                self.other_stats[stat_source] = stats_dict
+                self._other_stats[stat_source] = stats_dict
+
+    def _read_table_stats(self):
+        """
+        Reads the projections and season stats of a Player created by from_table.  The table only holds those two
+        splits, so the placeholders are empty.
+        """
+        table, row = self._table, self._row
+        self._table = None
+        self._projections = table.stat_line(table.projections, row)
+        self._season_stats = table.stat_line(table.season_stats, row)
+        self._projections_placeholder = {}
+        self._season_stats_placeholder = []
+        self._other_stats = {}
+        if self.is_hitter:
+            self._projected_pa = self._projections.get("PA", 0)
+        else:
+            self._projected_ip = self._projections.get("IP", 0)
 
     def get_player_stats(self):
         """
@@ -175,7 +320,7 @@ class Player:
         Get a weighted projection for a given statistic based on playing time.
         """
         if self.projections is None:
-            self._parse_projections()
+            self._parse_stats()
 
         if not self.projections:
             return 0
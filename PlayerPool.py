@@ -0,0 +1,187 @@
+FREE_AGENT = "Free Agent"
+
+
+class PlayerPool(dict):
+    """
+    Dictionary of player id to Player that keeps secondary indexes by fantasy team id, free agency, waiver status,
+    default position, eligible lineup slot and pro team.  Lookups cost time proportional to the size of the result
+    instead of a scan of the whole pool.
+
+    The indexes follow the Player attributes at the time a player is stored.  Code that changes a stored player's
+    team_id, fantasy_team or waiver_status must call reindex(player) afterwards, as Team.update_roster does.
+    """
+
+    def __init__(self, players: dict = None):
+        super().__init__()
+        # Each index maps a key to an insertion-ordered dict of player ids (used as an ordered set)
+        self._by_team = {}
+        self._by_position = {}
+        self._by_slot = {}
+        self._by_pro_team = {}
+        self._free_agents = {}
+        self._on_waivers = {}
+        # The index keys each player is currently stored under, so it can be removed from them
+        self._index_keys = {}
+        if players:
+            self.update(players)
+
+    def __setitem__(self, player_id, player):
+        if player_id in self:
+            self._unindex(player_id)
+        super().__setitem__(player_id, player)
+        self._index(player_id, player)
+
+    def __delitem__(self, player_id):
+        self._unindex(player_id)
+        super().__delitem__(player_id)
+
+    def pop(self, player_id, *default):
+        if player_id in self:
+            self._unindex(player_id)
+        return super().pop(player_id, *default)
+
+    def popitem(self):
+        player_id, player = super().popitem()
+        self._unindex(player_id)
+        return player_id, player
+
+    def setdefault(self, player_id, player=None):
+        if player_id not in self:
+            self[player_id] = player
+        return self[player_id]
+
+    def update(self, players=(), **kwargs):
+        for player_id, player in dict(players, **kwargs).items():
+            self[player_id] = player
+
+    def __ior__(self, players):
+        self.update(players)
+        return self
+
+    def clear(self):
+        super().clear()
+        for index in (self._by_team, self._by_position, self._by_slot, self._by_pro_team, self._free_agents,
+                      self._on_waivers, self._index_keys):
+            index.clear()
+
+    def reindex(self, player):
+        """
+        Updates the indexes of a stored player after its ownership or status attributes changed.
+        :param player: A Player stored in the pool.
+        :return: None
+        """
+        player_id = player.player_id
+        if player_id not in self:
+            return
+        old_keys, new_keys = self._index_keys[player_id], self._keys(player)
+        self._index_keys[player_id] = new_keys
+        # Only the entries whose key changed are touched, so players keep their pool order in the others
+        for index, old_key, new_key in zip(self._keyed_indexes(), old_keys, new_keys):
+            if old_key != new_key:
+                self._remove(index, old_key, player_id)
+                self._add(index, new_key, player_id)
+
+    def by_team(self, team_id):
+        """
+        :return: List of the players on the fantasy team.
+        """
+        return self._players(self._by_team.get(team_id, {}))
+
+    def free_agents(self):
+        """
+        :return: List of the players that are not on a fantasy team.
+        """
+        return self._players(self._free_agents)
+
+    def on_waivers(self):
+        """
+        :return: List of the players whose waiver status is not "NONE".
+        """
+        return self._players(self._on_waivers)
+
+    def query(self, team_id=None, free_agent: bool = None, on_waivers: bool = None, position_id=None, slot=None,
+              pro_team_id=None):
+        """
+        Returns the players matching every given filter.  The candidates come from the smallest matching index
+        and are checked against the other filters.
+        :param team_id: Fantasy team id.
+        :param free_agent: True for free agents only, False for rostered players only.
+        :param on_waivers: True for players on waivers only, False for players not on waivers only.
+        :param position_id: Default position id (see DEFAULT_POSITION_ID_MAP).
+        :param slot: Eligible lineup slot id (see POSITION_MAP).
+        :param pro_team_id: Pro team id (see PRO_TEAM_MAP).
+        :return: List of Player
+        """
+        candidate_sets = []
+        if team_id is not None:
+            candidate_sets.append(self._by_team.get(team_id, {}))
+        if free_agent:
+            candidate_sets.append(self._free_agents)
+        if on_waivers:
+            candidate_sets.append(self._on_waivers)
+        if position_id is not None:
+            candidate_sets.append(self._by_position.get(position_id, {}))
+        if slot is not None:
+            candidate_sets.append(self._by_slot.get(slot, {}))
+        if pro_team_id is not None:
+            candidate_sets.append(self._by_pro_team.get(pro_team_id, {}))
+        if not candidate_sets:
+            candidate_sets.append(self)
+
+        candidate_sets.sort(key=len)
+        smallest, others = candidate_sets[0], candidate_sets[1:]
+        matches = []
+        for player_id in smallest:
+            if all(player_id in ids for ids in others):
+                if free_agent is False and player_id in self._free_agents:
+                    continue
+                if on_waivers is False and player_id in self._on_waivers:
+                    continue
+                matches.append(self[player_id])
+        return matches
+
+    def _players(self, player_ids):
+        return [self[player_id] for player_id in player_ids]
+
+    @staticmethod
+    def _keys(player):
+        """
+        :return: The keys a player is indexed under, in the order of _keyed_indexes.
+        """
+        return (player.team_id, player.default_position_id, tuple(player.eligible_slots or ()), player.pro_team_id,
+                player.fantasy_team == FREE_AGENT, player.waiver_status not in (None, "NONE"))
+
+    def _keyed_indexes(self):
+        # Dictionaries of key to player ids are given as is; the flag indexes hold the ids of players whose flag is
+        # True; the slot index is keyed by every eligible slot
+        return self._by_team, self._by_position, self._by_slot, self._by_pro_team, self._free_agents, self._on_waivers
+
+    def _add(self, index, key, player_id):
+        if index is self._free_agents or index is self._on_waivers:
+            if key:
+                index[player_id] = None
+        elif index is self._by_slot:
+            for slot in key:
+                index.setdefault(slot, {})[player_id] = None
+        else:
+            index.setdefault(key, {})[player_id] = None
+
+    def _remove(self, index, key, player_id):
+        if index is self._free_agents or index is self._on_waivers:
+            index.pop(player_id, None)
+        elif index is self._by_slot:
+            for slot in key:
+                index[slot].pop(player_id, None)
+        else:
+            index[key].pop(player_id, None)
+
+    def _index(self, player_id, player):
+        keys = self._keys(player)
+        self._index_keys[player_id] = keys
+        for index, key in zip(self._keyed_indexes(), keys):
+            self._add(index, key, player_id)
+
+    def _unindex(self, player_id):
+        keys = self._index_keys.pop(player_id)
+        for index, key in zip(self._keyed_indexes(), keys):
+            self._remove(index, key, player_id)
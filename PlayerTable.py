@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+from Player import Player, StatLine, PROJECTION_SPLIT_ID
+
+
+INFO_COLUMNS = ["Player ID", "Player Name", "Active", "Default Position ID", "Pro Team ID", "Injury Status",
+                "Ownership", "Eligible Slots", "On Team ID", "Waiver Status"]
+# Id columns may be missing from the JSON, so they use pandas' nullable integer type instead of float NaN
+INFO_DTYPES = {"Player ID": "Int64", "Default Position ID": "Int64", "Pro Team ID": "Int64", "On Team ID": "Int64",
+               "Eligible Slots": object}
+
+
+class PlayerTable:
+    """
+    Columnar table of the player pool with one row per player, built in a single pass over the kona_player_info
+    player JSON.
+
+    info holds the identity and status columns (INFO_COLUMNS).  projections and season_stats hold the ESPN
+    projections and the season totals as wide blocks with one float64 column per stat id, in stat id order, and
+    NaN for stats a player does not have.  All three share the same row order, so masks computed on one can be
+    applied to the others.
+    """
+
+    def __init__(self, columns: dict, projections: pd.DataFrame, season_stats: pd.DataFrame):
+        """
+        :param columns: Dictionary of INFO_COLUMNS name to list of values.
+        :param projections: Wide projections block.
+        :param season_stats: Wide season stats block.
+        """
+        self.info = pd.DataFrame({name: pd.array(values, dtype=INFO_DTYPES[name]) if name in INFO_DTYPES else values
+                                  for name, values in columns.items()}, columns=INFO_COLUMNS)
+        self.projections = projections
+        self.season_stats = season_stats
+        # The info rows as tuples of Python values, which Player views are created from
+        self.records = list(zip(*(columns[name] for name in INFO_COLUMNS)))
+        # Row position of every player id
+        self.rows = {player_id: row for row, player_id in enumerate(columns["Player ID"])}
+
+    def __len__(self):
+        return len(self.info)
+
+    @classmethod
+    def from_json(cls, players_json):
+        """
+        Builds the table from kona_player_info or mRoster player JSON.
+        :param players_json: Iterable of player JSON.  Consumed once, so a generator such as
+                             ESPNRequester.iter_players can be passed.
+        :return: PlayerTable
+        """
+        columns = {name: [] for name in INFO_COLUMNS}
+        projections = []
+        season_stats = []
+        for player_json in players_json:
+            fantasy_data = player_json.get("playerPoolEntry", player_json)
+            data = fantasy_data["player"]
+            columns["Player ID"].append(data.get("id"))
+            columns["Player Name"].append(data.get("fullName", "Unknown Player"))
+            columns["Active"].append(data.get("active"))
+            columns["Default Position ID"].append(data.get("defaultPositionId"))
+            columns["Pro Team ID"].append(data.get("proTeamId"))
+            columns["Injury Status"].append(data.get("injuryStatus", "N/A"))
+            columns["Ownership"].append(data.get("ownership", {}).get("percentOwned", 0))
+            columns["Eligible Slots"].append(data.get("eligibleSlots", []))
+            columns["On Team ID"].append(fantasy_data.get("onTeamId", 0))
+            columns["Waiver Status"].append(fantasy_data.get("waiverStatus", {}).get("status", "NONE"))
+
+            projection, season = None, None
+            for stat in data.get("stats") or ():
+                source = stat.get("statSourceId")
+                if source == 1 and stat.get("id") == PROJECTION_SPLIT_ID:
+                    projection = stat.get("stats")
+                elif source == 0 and stat.get("statSplitTypeId") == 0:
+                    season = stat.get("stats")
+            projections.append(projection)
+            season_stats.append(season)
+
+        return cls(columns, _stat_block(projections), _stat_block(season_stats))
+
+    @classmethod
+    def from_players(cls, players):
+        """
+        Builds the table from existing Player objects, for instance a player pool assigned by hand.
+        :param players: Iterable of Player.
+        :return: PlayerTable
+        """
+        columns = {name: [] for name in INFO_COLUMNS}
+        projections = []
+        season_stats = []
+        for player in players:
+            columns["Player ID"].append(player.player_id)
+            columns["Player Name"].append(player.full_name)
+            columns["Active"].append(player.active)
+            columns["Default Position ID"].append(player.default_position_id)
+            columns["Pro Team ID"].append(player.pro_team_id)
+            columns["Injury Status"].append(player.injury_status)
+            columns["Ownership"].append(player.ownership)
+            columns["Eligible Slots"].append(player.eligible_slots)
+            columns["On Team ID"].append(player.team_id or 0)
+            columns["Waiver Status"].append(player.waiver_status)
+            projections.append(player.projections)
+            season_stats.append(player.season_stats)
+
+        return cls(columns, _stat_block(projections), _stat_block(season_stats))
+
+    def players(self):
+        """
+        Creates a Player view for every row of the table.
+        :return: List of Player
+        """
+        return [Player.from_table(self, row) for row in range(len(self))]
+
+    def stat_line(self, block: pd.DataFrame, row: int):
+        """
+        :param block: projections or season_stats.
+        :param row: Row position of the player.
+        :return: The player's stats of the block as a StatLine.
+        """
+        values = block.to_numpy()[row]
+        return StatLine({stat_id: value for stat_id, value in zip(block.columns, values) if value == value})
+
+    def select(self, player_ids):
+        """
+        :param player_ids: Sequence of player ids, which must all be in the table.
+        :return: Array of the row positions of the players, in the given order.
+        """
+        rows = self.rows
+        return np.fromiter((rows[player_id] for player_id in player_ids), dtype=np.intp, count=len(player_ids))
+
+
+def _stat_block(stat_dicts):
+    """
+    Decodes ESPN stats dictionaries into a wide DataFrame with one column per stat id found.  Values are truncated
+    to integers and infinite values stored as 0, as StatLine does.  Rows without a dictionary are all NaN.
+    :param stat_dicts: List of stats dictionaries or StatLines, or None for players without the split.
+    :return: DataFrame
+    """
+    positions = {}  # stat id key -> column position, so int() runs once per distinct key
+    columns = {}  # stat id -> column position
+    stat_ids = []
+    rows, cols, values = [], [], []
+    for row, stat_dict in enumerate(stat_dicts):
+        if not stat_dict:
+            continue
+        for key, value in stat_dict.items():
+            position = positions.get(key)
+            if position is None:
+                try:
+                    stat_id = int(key)
+                except (ValueError, TypeError):
+                    continue
+                position = columns.get(stat_id)
+                if position is None:
+                    position = columns[stat_id] = len(stat_ids)
+                    stat_ids.append(stat_id)
+                positions[key] = position
+            rows.append(row)
+            cols.append(position)
+            values.append(value)
+
+    dense = np.full((len(stat_dicts), len(stat_ids)), np.nan)
+    if values:
+        decoded = np.asarray(values, dtype=np.float64)
+        decoded[np.isinf(decoded)] = 0
+        dense[rows, cols] = np.trunc(decoded)
+    order = np.argsort(stat_ids, kind="stable")
+    return pd.DataFrame(dense[:, order], columns=[stat_ids[i] for i in order])
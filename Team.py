@@ -1,5 +1,164 @@
+import numpy as np
 import pandas as pd
 from espn_constant import HITTING_MAP, PITCHING_MAP, POSITION_MAP, MATCHUP_PERIOD_MAP_2021
+from PlayerPool import PlayerPool, FREE_AGENT
+from stat_decoder import HITTING_DECODER, PITCHING_DECODER
+
+
+SHARED_COLUMNS = ["Team ID", "Player Name", "ESPN Player ID", "Scoring Period", "Matchup Period", "Lineup ID",
+                  "Position"]
+HITTING_COLUMNS = HITTING_DECODER.columns
+PITCHING_COLUMNS = PITCHING_DECODER.columns
+# Integer identifier columns of the daily frames; the stat columns are float64
+INTEGER_COLUMNS = ["Team ID", "ESPN Player ID", "Scoring Period", "Matchup Period", "Lineup ID"]
+# Dtypes of the league-wide daily frames built by compact_daily_frame; every other column is a float32 stat
+COMPACT_DTYPES = {"Team ID": np.int16, "Player Name": "category", "ESPN Player ID": np.int32,
+                  "Scoring Period": np.int16, "Matchup Period": np.int16, "Lineup ID": np.int16,
+                  "Position": "category", "Stat ID": np.int16}
+# Columns identifying a player-day in the long daily frames built by Team.get_daily_stats_long
+LONG_ENTRY_COLUMNS = ["Team ID", "ESPN Player ID", "Scoring Period", "Lineup ID"]
+LONG_COLUMNS = ["Team ID", "ESPN Player ID", "Player Name", "Scoring Period", "Matchup Period", "Lineup ID", "Stat ID",
+                "Value"]
+
+
+def schedule_matchup_periods(schedule: list):
+    """
+    Collects the scoring periods of each matchup period from the league schedule.  The matchupPeriods of the
+    scheduleSettings list matchup period ids rather than days, so the days come from the scoring period keys of the
+    pointsByScoringPeriod of every matchup's home and away team.  Matchups that have not started have none.
+    :param schedule: The "schedule" list of the mMatchupScore view.
+    :return: Dictionary of matchup period to the sorted list of its scoring periods.
+    """
+    matchup_periods = {}
+    for matchup in schedule:
+        scoring_periods = matchup_periods.setdefault(int(matchup["matchupPeriodId"]), set())
+        for side in ("home", "away"):
+            points = (matchup.get(side) or {}).get("pointsByScoringPeriod") or {}
+            scoring_periods.update(int(scoring_period) for scoring_period in points)
+    return {matchup_period: sorted(scoring_periods) for matchup_period, scoring_periods in matchup_periods.items()}
+
+
+def build_matchup_period_lookup(matchup_periods: dict, final_scoring_period: int = None,
+                                played_through: int = None):
+    """
+    Builds a list indexed by scoring period whose values are the matchup period containing it (0 if none).
+    :param matchup_periods: Dictionary of matchup period to the scoring periods it spans, such as the result of
+                            schedule_matchup_periods.  Keys may be strings.
+    :param final_scoring_period: If given, the schedule is checked to assign every scoring period to at most one
+                                 matchup period, and none past final_scoring_period.  A ValueError is raised otherwise.
+    :param played_through: Last scoring period that must be assigned; scoring periods after it may be missing, since
+                           the schedule only lists the days of matchups that have started.  Defaults to
+                           final_scoring_period.
+    :return: list
+    """
+    if final_scoring_period is not None:
+        _check_matchup_periods(matchup_periods, final_scoring_period,
+                               final_scoring_period if played_through is None else played_through)
+    last_scoring_period = max((max(periods) for periods in matchup_periods.values() if periods), default=0)
+    lookup = [0] * (last_scoring_period + 1)
+    for matchup_period, scoring_periods in matchup_periods.items():
+        for scoring_period in scoring_periods:
+            lookup[scoring_period] = int(matchup_period)
+    return lookup
+
+
+def _check_matchup_periods(matchup_periods: dict, final_scoring_period: int, played_through: int):
+    """
+    Raises a ValueError unless matchup_periods maps integer matchup periods to integer scoring periods that cover
+    1 to played_through, each in a single matchup period, without going past final_scoring_period.
+    """
+    assigned = {}
+    for matchup_period, scoring_periods in matchup_periods.items():
+        try:
+            int(matchup_period)
+        except (TypeError, ValueError):
+            raise ValueError(f"Matchup period {matchup_period!r} is not an integer")
+        for scoring_period in scoring_periods:
+            if isinstance(scoring_period, bool) or not isinstance(scoring_period, int):
+                raise ValueError(f"Scoring period {scoring_period!r} of matchup period {matchup_period} is not an "
+                                 f"integer")
+            if not 1 <= scoring_period <= final_scoring_period:
+                raise ValueError(f"Scoring period {scoring_period} of matchup period {matchup_period} is outside "
+                                 f"1 to {final_scoring_period}")
+            if assigned.get(scoring_period, matchup_period) != matchup_period:
+                raise ValueError(f"Scoring period {scoring_period} is in matchup periods "
+                                 f"{assigned[scoring_period]} and {matchup_period}")
+            assigned[scoring_period] = matchup_period
+    missing = set(range(1, played_through + 1)) - set(assigned)
+    if missing:
+        raise ValueError(f"Scoring periods {sorted(missing)} are not in any matchup period")
+
+
+# Used when Team methods are called without a league's schedule
+DEFAULT_MATCHUP_PERIOD_LOOKUP = build_matchup_period_lookup(MATCHUP_PERIOD_MAP_2021)
+
+
+def compact_daily_frame(frame: pd.DataFrame):
+    """
+    Converts a daily stats DataFrame to compact dtypes: categoricals for names and positions, small integers for
+    identifiers and periods, and float32 for stats.  Applying it to an already compact frame is cheap.
+    :param frame: Daily hitting or pitching DataFrame.
+    :return: Pandas DataFrame
+    """
+    return frame.astype({column: COMPACT_DTYPES.get(column, np.float32) for column in frame.columns})
+
+
+def concat_daily_frames(frames: list):
+    """
+    Concatenates daily stats DataFrames once and returns the result with compact dtypes.
+    :param frames: List of daily hitting or pitching DataFrames.
+    :return: Pandas DataFrame
+    """
+    if not frames:
+        return pd.DataFrame()
+    return compact_daily_frame(pd.concat(frames, ignore_index=True))
+
+
+def pivot_daily_stats(long_frame: pd.DataFrame, stat_map: dict, categories=None):
+    """
+    Rebuilds the wide daily layout of get_daily_stats from a long daily frame, with stat columns for the requested
+    categories only.  Player-days keep the order in which they appear in long_frame, and player-days without any
+    non-zero stat come back from their EMPTY_STAT_ID entry, so pivoting every stat gives the frame of
+    get_daily_stats back.
+    :param long_frame: Long hitting or pitching frame built by Team.get_daily_stats_long.
+    :param stat_map: HITTING_MAP for hitting frames or PITCHING_MAP for pitching frames.
+    :param categories: Iterable of stat ids or column names of stat_map.  Defaults to every stat of stat_map.
+    :return: Pandas DataFrame with compact dtypes
+    """
+    stat_ids_by_name = {name: stat_id for stat_id, name in stat_map.items()}
+    if categories is None:
+        stat_ids = list(stat_map)
+    else:
+        stat_ids = [category if category in stat_map else stat_ids_by_name[category] for category in categories]
+    names = [stat_map[stat_id] for stat_id in stat_ids]
+    if long_frame.empty:
+        return compact_daily_frame(pd.DataFrame(columns=SHARED_COLUMNS + names))
+
+    # Number the player-days in order of appearance and keep the first long row of each for its identifiers
+    entry = long_frame.groupby(LONG_ENTRY_COLUMNS, sort=False).ngroup().to_numpy()
+    _, first = np.unique(entry, return_index=True)
+    entries = long_frame.iloc[first]
+
+    # Column of every long row in the result, -1 for stats that were not requested and for EMPTY_STAT_ID entries
+    row_stat_ids = long_frame["Stat ID"].to_numpy()
+    column_lookup = np.full(max(max(stat_map), int(row_stat_ids.max())) + 1, -1)
+    column_lookup[stat_ids] = np.arange(len(stat_ids))
+    columns = np.where(row_stat_ids >= 0, column_lookup[np.maximum(row_stat_ids, 0)], -1)
+    requested = columns >= 0
+    stats = np.zeros((len(first), len(stat_ids)), dtype=np.float32)
+    stats[entry[requested], columns[requested]] = long_frame["Value"].to_numpy()[requested]
+
+    frame = {
+        "Team ID": entries["Team ID"].to_numpy(),
+        "Player Name": entries["Player Name"].to_numpy(),
+        "ESPN Player ID": entries["ESPN Player ID"].to_numpy(),
+        "Scoring Period": entries["Scoring Period"].to_numpy(),
+        "Matchup Period": entries["Matchup Period"].to_numpy(),
+        "Lineup ID": entries["Lineup ID"].to_numpy(),
+        "Position": entries["Lineup ID"].map(POSITION_MAP).to_numpy(),
+    }
+    frame.update(zip(names, stats.T))
+    return compact_daily_frame(pd.DataFrame(frame))
 
 
 class Team:
@@ -16,17 +175,37 @@ class Team:
         self.transaction_counter = None
         self.division_id = None
         self.team_json = team_json
-        self.hitting_frame = pd.DataFrame()
-        self.pitching_frame = pd.DataFrame()
-        self.roster_df = self.get_roster_df()
-        self.create_frame_templates()
+        # Empty daily stats templates, built by create_frame_templates on first access
+        self._hitting_frame = None
+        self._pitching_frame = None
         if self.team_json is not None:
             self.update_team_info(self.team_json)
             self.update_season_stats(self.team_json)
+        self.roster_df = self.get_roster_df()
 
     def __repr__(self):
         return f"{self.name}"
 
+    @property
+    def hitting_frame(self):
+        if self._hitting_frame is None:
+            self.create_frame_templates()
+        return self._hitting_frame
+
+    @hitting_frame.setter
+    def hitting_frame(self, hitting_frame):
+        self._hitting_frame = hitting_frame
+
+    @property
+    def pitching_frame(self):
+        if self._pitching_frame is None:
+            self.create_frame_templates()
+        return self._pitching_frame
+
+    @pitching_frame.setter
+    def pitching_frame(self, pitching_frame):
+        self._pitching_frame = pitching_frame
+
     def create_frame_templates(self):
         """
         Creates a list of the pitching and hitting columns to be used in the statistical DataFrames.
@@ -67,14 +246,8 @@ class Team:
         :return: None
         """
         data = team_json["valuesByStat"]
-        hitting_dict = {}
-        pitching_dict = {}
-        for stat in data:
-            stat = int(stat)
-            if stat <= 31:
-                hitting_dict[HITTING_MAP[stat]] = data[str(stat)]
-            elif 33 <= stat <= 66:
-                pitching_dict[PITCHING_MAP[stat]] = data[str(stat)]
+        hitting_dict = self.process_hitting_stats(data)
+        pitching_dict = self.process_pitching_stats(data)
         self.season_hitting = pd.DataFrame(hitting_dict, index=[self.team_id])
         self.season_hitting.index.name = 'team_id'
         self.season_hitting.insert(0, "Team", self.name)
@@ -82,39 +255,106 @@ class Team:
         self.season_pitching.index.name = 'team_id'
         self.season_pitching.insert(0, "Team", self.name)
 
-    def get_daily_stats(self, roster_json: dict):
+    def get_daily_stats(self, roster_json: dict, matchup_periods: list = None):
         """
         Parses the JSON info returned from the ESPN API and stores the statistics of the team in a DataFrame.
+        Rows are gathered column by column and each frame is built once, with integer identifier columns and
+        float64 stat columns decoded in one batch by the stat decoders.  Stats a player did not record are 0.
         Need to sort stats for ease of viewing.
         :param roster_json: The team roster JSON returned from the ESPN API for the specified scoring period.
+        :param matchup_periods: Matchup period of each scoring period, built by build_matchup_period_lookup from
+                                the league's schedule.  Defaults to the 2021 schedule.
         :return: Pandas DataFrame
         """
-        hitting_df = self.hitting_frame.copy(deep=True)
-        pitching_df = self.pitching_frame.copy(deep=True)
+        hitting, hitting_stats, pitching, pitching_stats = self._gather_daily_stats(roster_json, matchup_periods)
+        hitting_df = self._build_daily_frame(hitting, HITTING_DECODER.decode(hitting_stats), HITTING_COLUMNS)
+        pitching_df = self._build_daily_frame(pitching, PITCHING_DECODER.decode(pitching_stats), PITCHING_COLUMNS)
+        return hitting_df, pitching_df
+
+    def get_daily_stats_long(self, roster_json: dict, matchup_periods: list = None):
+        """
+        Parses the JSON info returned from the ESPN API into long hitting and pitching frames with one row per
+        non-zero stat of a player in an active spot: LONG_COLUMNS, where Stat ID is the ESPN stat id.  Stats that
+        are missing or 0 take no space; a player-day without any non-zero stat keeps a single row with Stat ID
+        EMPTY_STAT_ID.  Use pivot_daily_stats to get the wide layout of get_daily_stats back.
+        :param roster_json: The team roster JSON returned from the ESPN API for the specified scoring period.
+        :param matchup_periods: Matchup period of each scoring period.  Defaults to the 2021 schedule.
+        :return: A tuple of hitting and pitching DataFrames
+        """
+        hitting, hitting_stats, pitching, pitching_stats = self._gather_daily_stats(roster_json, matchup_periods)
+        hitting_df = self._build_long_frame(hitting, HITTING_DECODER.decode_long(hitting_stats))
+        pitching_df = self._build_long_frame(pitching, PITCHING_DECODER.decode_long(pitching_stats))
+        return hitting_df, pitching_df
+
+    def _gather_daily_stats(self, roster_json: dict, matchup_periods: list = None):
+        """
+        Gathers the identifier columns and stats dictionaries of the players in active hitting and pitching spots.
+        :param roster_json: The team roster JSON returned from the ESPN API for the specified scoring period.
+        :param matchup_periods: Matchup period of each scoring period.  Defaults to the 2021 schedule.
+        :return: A tuple of the hitting identifier columns, hitting stats dictionaries, pitching identifier columns
+                 and pitching stats dictionaries.
+        """
+        if matchup_periods is None:
+            matchup_periods = DEFAULT_MATCHUP_PERIOD_LOOKUP
+        hitting = {column: [] for column in SHARED_COLUMNS}
+        pitching = {column: [] for column in SHARED_COLUMNS}
+        hitting_stats = []
+        pitching_stats = []
         for player in roster_json:
-            player_dict = {"Team ID": self.team_id, "Player Name": player["playerPoolEntry"]["player"]["fullName"],
-                           "ESPN Player ID": player["playerId"], "Lineup ID": player["lineupSlotId"],
-                           "Position": POSITION_MAP[player["lineupSlotId"]]}
-            for stat_set in player["playerPoolEntry"]["player"]["stats"]:
+            lineup_id = int(player["lineupSlotId"])
+            # checks if the player is in an active hitting or pitching spot
+            if lineup_id <= 12 or lineup_id == 19:
+                columns, stat_dicts = hitting, hitting_stats
+            elif 13 <= lineup_id <= 15:
+                columns, stat_dicts = pitching, pitching_stats
+            else:
+                continue
+            player_info = player["playerPoolEntry"]["player"]
+            for stat_set in player_info["stats"]:
                 if stat_set["statSourceId"] == 0 and stat_set["statSplitTypeId"] == 5:
-                    player_dict["Scoring Period"] = stat_set["scoringPeriodId"]
-                    for key in MATCHUP_PERIOD_MAP_2021:
-                        if player_dict["Scoring Period"] in MATCHUP_PERIOD_MAP_2021[key]:
-                            player_dict["Matchup Period"] = key
-                    # checks if the player is in an active hitting spot and adds hitting stats to the player dict
-                    if int(player_dict["Lineup ID"]) <= 12 or int(player_dict["Lineup ID"]) == 19:
-                        player_dict.update(self.process_hitting_stats(stat_set["stats"]))
-                        player_df = pd.DataFrame([player_dict])
-                        hitting_df = pd.concat([hitting_df, player_df], ignore_index=True)
-                    # checks if the player is in an active pitching spot and adds pitching stats to the player dict
-                    elif 13 <= int(player_dict["Lineup ID"]) <= 15:
-                        player_dict.update(self.process_pitching_stats(stat_set["stats"]))
-                        player_df = pd.DataFrame(
-                            [player_dict])  # Convert dict to DataFrame (ensure it's a list of dicts)
-                        pitching_df = pd.concat([pitching_df, player_df], ignore_index=True)
-        hitting_df.fillna(0, inplace=True)
-        pitching_df.fillna(0, inplace=True)
-        return hitting_df, pitching_df
+                    scoring_period = stat_set["scoringPeriodId"]
+                    matchup_period = matchup_periods[scoring_period] if scoring_period < len(matchup_periods) else 0
+                    columns["Team ID"].append(self.team_id)
+                    columns["Player Name"].append(player_info["fullName"])
+                    columns["ESPN Player ID"].append(player["playerId"])
+                    columns["Scoring Period"].append(scoring_period)
+                    columns["Matchup Period"].append(matchup_period)
+                    columns["Lineup ID"].append(lineup_id)
+                    columns["Position"].append(POSITION_MAP[lineup_id])
+                    stat_dicts.append(stat_set["stats"])
+        return hitting, hitting_stats, pitching, pitching_stats
+
+    @staticmethod
+    def _build_long_frame(shared_columns: dict, long_stats: tuple):
+        """
+        Builds a long daily stats DataFrame from the gathered identifier columns and the decoded long stats.
+        :param shared_columns: Dictionary of identifier column name to list of values, one per stats dictionary.
+        :param long_stats: Tuple of entry rows, stat ids and values returned by StatDecoder.decode_long.
+        :return: Pandas DataFrame
+        """
+        rows, stat_ids, values = long_stats
+        columns = {}
+        for column in LONG_COLUMNS:
+            if column in shared_columns:
+                dtype = np.int64 if column in INTEGER_COLUMNS else object
+                columns[column] = np.asarray(shared_columns[column], dtype=dtype)[rows]
+        columns["Stat ID"] = stat_ids
+        columns["Value"] = values
+        return pd.DataFrame(columns)
+
+    @staticmethod
+    def _build_daily_frame(shared_columns: dict, stats: np.ndarray, stat_columns: list):
+        """
+        Builds a daily stats DataFrame in one step from the gathered identifier columns and stat block.
+        :param shared_columns: Dictionary of identifier column name to list of values.
+        :param stats: 2-D array of stat values with one column per entry of stat_columns.
+        :param stat_columns: Names of the stat columns.
+        :return: Pandas DataFrame
+        """
+        columns = {column: np.asarray(shared_columns[column], dtype=np.int64 if column in INTEGER_COLUMNS else object)
+                   for column in SHARED_COLUMNS}
+        columns.update(zip(stat_columns, stats.T))
+        return pd.DataFrame(columns)
 
     @staticmethod
     def process_hitting_stats(stat_dict):
@@ -124,15 +364,7 @@ class Team:
         :param stat_dict: statistic dictionary taken from roster JSON data
         :return: human-readable hitting dictionary
         """
-        hitting_columns = []
-        for stat in HITTING_MAP:
-            hitting_columns.append(HITTING_MAP[stat])
-        hitting_dict = dict()
-        for stat in stat_dict:
-            stat = int(stat)
-            if stat <= 31:
-                hitting_dict[HITTING_MAP[stat]] = stat_dict[str(stat)]
-        return hitting_dict
+        return HITTING_DECODER.to_dict(stat_dict)
 
     @staticmethod
     def process_pitching_stats(stat_dict):
@@ -142,12 +374,7 @@ class Team:
         :param stat_dict: statistic dictionary taken from roster JSON data
         :return: human-readable pitching dictionary
         """
-        pitching_dict = dict()
-        for stat in stat_dict:
-            stat = int(stat)
-            if 33 <= stat <= 66:
-                pitching_dict[PITCHING_MAP[stat]] = stat_dict[str(stat)]
-        return pitching_dict
+        return PITCHING_DECODER.to_dict(stat_dict)
 
     def get_roster_df(self):
         """
@@ -192,6 +419,14 @@ class Team:
         Option 1: Reference directly (recommended if you want the roster to reflect live updates)
         Option 2: Create a copy (if you need a static snapshot of the roster)
         """
+        # Players of the previous roster, and players the pool still lists on this team, that are not on the new
+        # roster become free agents unless another team has claimed them already.  Without roster data (a failed
+        # request) ownership is left as it is.
+        previous = {}
+        if "roster" in roster_json:
+            previous.update(self.current_roster or {})
+            if isinstance(player_pool, PlayerPool):
+                previous.update((player.player_id, player) for player in player_pool.by_team(self.team_id))
         self.current_roster = {}  # Reset roster
 
         # Assume that self.team_json["roster"]["entries"] contains the roster entries with player IDs.
@@ -200,12 +435,24 @@ class Team:
             player_id = entry["playerPoolEntry"]["player"]["id"]
             if player_id in player_pool:
                 # Option 1: Reference the same Player object
-                self.current_roster[player_id] = player_pool[player_id]
-                player_pool[player_id].fantasy_team = self.name
+                player = player_pool[player_id]
+                self.current_roster[player_id] = player
+                player.team_id = self.team_id
+                player.fantasy_team = self.name
+                if isinstance(player_pool, PlayerPool):
+                    # Keep the pool's team and free agent indexes in step with the new owner
+                    player_pool.reindex(player)
 
                 # Option 2: Make a deep copy (uncomment the following line if needed)
                 # self.current_roster[player_id] = copy.deepcopy(player_pool[player_id])
 
+        for player_id, player in previous.items():
+            if player_id not in self.current_roster and player.team_id == self.team_id:
+                player.team_id = None
+                player.fantasy_team = FREE_AGENT
+                if isinstance(player_pool, PlayerPool) and player_pool.get(player_id) is player:
+                    player_pool.reindex(player)
+
     def display_all_rosters(self):
         """
         Prints the combined roster DataFrame for all teams.
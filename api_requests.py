@@ -1,17 +1,142 @@
 import requests
+from requests.adapters import HTTPAdapter
 import json
+import json_backend
 import os
+import random
+import re
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from urllib.parse import urlparse
+from cache import ResponseCache
+from transport import HTTPTransport
+from rate_limit import TokenBucket, get_rate_limiter, parse_retry_after
+
+# HTTP status codes that are worth retrying: throttling and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Seasons before this one are only served by the leagueHistory endpoint
+HISTORY_END_SEASON = 2018
+HISTORY_URL = "https://lm-api-reads.fantasy.espn.com/apis/v3/games/flb/leagueHistory/{league_id}"
+
+
+class ESPNRequestError(Exception):
+    """
+    Raised where a failed request cannot be reported by returning None, such as while loading an AsyncLeague.
+    """
+
+
+class PlayerPageError(ESPNRequestError):
+    """
+    Raised by ESPNRequester.iter_players when a page of the player pool cannot be fetched, so a failed request is
+    not mistaken for the end of the pool.
+    """
+
+
+def create_session(pool_size: int = 10):
+    """
+    Creates a requests Session whose connection pool holds up to pool_size keep-alive connections per host.
+    A single session can be passed to several ESPNRequester (or League) objects so they share connections.
+    :param pool_size: Maximum number of pooled connections per host.
+    :return: requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def iter_json_array(f, key: str, chunk_size: int = 64 * 1024):
+    """
+    Incrementally decodes the items of the first JSON array stored under key in a file, without reading the
+    whole document into memory.  Only one chunk and the item being decoded are held at a time.
+    Items are decoded with the standard library's JSONDecoder.raw_decode rather than json_backend: raw_decode
+    reports where an item ends in a partial buffer, while orjson only decodes complete documents, so it could only
+    be used after a second pass finding every item's end.
+    :param f: A file object opened in text mode.
+    :param key: The object key of the array, for example "players".
+    :param chunk_size: Number of characters read from the file at a time.
+    :return: A generator of the decoded array items.
+    """
+    decoder = json.JSONDecoder()
+    start = re.compile(r'"%s"\s*:\s*\[' % re.escape(key))
+    separators = re.compile(r'[\s,]*')
+    buffer = ""
+    while True:
+        match = start.search(buffer)
+        if match:
+            buffer = buffer[match.end():]
+            break
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        buffer = buffer[-256:] + chunk  # Keeps enough of the previous chunk to match a key split across reads
+
+    pos = 0
+    while True:
+        pos = separators.match(buffer, pos).end()
+        if pos == len(buffer):
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise ValueError(f'Unterminated "{key}" array')
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        if buffer[pos] == "]":
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            # The item continues in the next chunk
+            chunk = f.read(chunk_size)
+            if not chunk:
+                raise
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+        yield item
+        pos = end
+        if pos >= chunk_size:
+            buffer, pos = buffer[pos:], 0
 
 
 class ESPNRequester:
-    def __init__(self, league_id: int, season_id: int, swid: str = None, espn_s2: str = None):
+    def __init__(self, league_id: int, season_id: int, swid: str = None, espn_s2: str = None,
+                 session: requests.Session = None, pool_size: int = 10, timeout: float = 30,
+                 max_retries: int = 3, backoff_factor: float = 0.5, max_backoff: float = 30,
+                 cache: ResponseCache = None, transport=None, rate_limiter: TokenBucket = None):
+        """
+        :param session: An existing requests Session to share with other requesters.  A pooled session is
+                        created when omitted.
+        :param pool_size: Connection pool size of the session created when session is omitted.
+        :param timeout: Seconds to wait for the server to respond to each request.
+        :param max_retries: Number of times a request is retried after a 429/5xx response or a connection error.
+        :param backoff_factor: Base delay in seconds of the exponential backoff between retries.
+        :param max_backoff: Upper bound in seconds of a single backoff delay.
+        :param cache: Optional ResponseCache consulted before every request.
+        :param transport: Optional transport that sends the requests (see transport.py), such as a
+                          RecordingTransport or ReplayTransport.  Defaults to an HTTPTransport over the session.
+        :param rate_limiter: Optional rate_limit.TokenBucket.  Defaults to the process-wide limiter of the API host,
+                             shared by every requester (see rate_limit.configure_rate_limit).
+        """
         self.league_id = league_id
         self.season_id = season_id
+        self.session = session if session is not None else self._create_session(pool_size)
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.cache = cache
+        self.transport = transport if transport is not None else HTTPTransport(self.session)
+        # The scoring period currently in progress.  Set by League from the league status; responses for earlier
+        # scoring periods are complete and are cached permanently.
+        self.current_scoring_period = None
         # The base url for api requests of the specified fantasy league.  Only valid for season_id > 2018
-        if self.season_id >= 2018:
+        if self.season_id >= HISTORY_END_SEASON:
             self.url = f"https://lm-api-reads.fantasy.espn.com/apis/v3/games/flb/seasons/{season_id}/segments/0/leagues/{league_id}"
-        elif self.season_id <= 2017:
-            self.url = f"https://lm-api-reads.fantasy.espn.com/apis/v3/games/flb/leagueHistory/{league_id}?seasonId={season_id}"
+        else:
+            self.url = f"{HISTORY_URL.format(league_id=league_id)}?seasonId={season_id}"
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter(urlparse(self.url).hostname)
         self.cookies = {"SWID": swid, "espn_s2": espn_s2}
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
@@ -23,7 +148,27 @@ class ESPNRequester:
             "Origin": "https://fantasy.espn.com"
         }
 
-    def fetch_data(self, params, extend='', headers=None):
+    def _create_session(self, pool_size: int):
+        """
+        Creates the session used when none is passed to the constructor.
+        :param pool_size: Connection pool size of the session.
+        :return: requests.Session
+        """
+        return create_session(pool_size)
+
+    def _unwrap(self, data, key: str = None):
+        """
+        Strips the list wrapper of leagueHistory responses (seasons before 2018) and optionally selects a key.
+        :param data: Decoded JSON returned by fetch_data.
+        :param key: Optional top level key to return, such as "teams" or "players".
+        :return: The unwrapped data, or None if the request failed.
+        """
+        if not data:
+            return None
+        data = data[0] if self.season_id < HISTORY_END_SEASON else data
+        return data[key] if key is not None else data
+
+    def fetch_data(self, params, extend='', headers=None, base_url=None):
         """
         Helper function to fetch data with headers and error handling.
 
@@ -31,26 +176,92 @@ class ESPNRequester:
           - params: dict, query parameters to include in the URL.
           - extend: str, additional URL path to append to the base URL (default is empty).
           - headers: dict, extra headers to merge with the default headers (default is None).
+          - base_url: str, URL requested instead of the season's base URL (default is None).
         """
-        url = f"{self.url}{extend}"
-        full_url = f"{url}?{requests.compat.urlencode(params)}"
-        print(f"🔗 Fetching data from: {full_url}")  # Print the full URL
-
+        base_url = base_url if base_url is not None else self.url
+        url = f"{base_url}{extend}"
         request_headers = self.headers.copy()
         if headers:
             request_headers.update(headers)
 
-        try:
-            response = requests.get(self.url, params=params, cookies=self.cookies,
-                                    headers=request_headers)
-            response.raise_for_status()  # Raises an error for HTTP errors (403, 404, etc.)
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            print(f"⚠️ Error fetching data from ESPN API: {e}")
-            print(f"Status Code: {response.status_code}")
-            print(
-                f"Response Text: {response.text[:500]}")  # Print first 500 characters of the response for debugging
-            return None  # Returns None instead of crashing
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ResponseCache.make_key(url, params, request_headers.get("x-fantasy-filter"))
+            data = self.cache.get(cache_key)
+            if data is not None:
+                return data
+
+        full_url = f"{url}?{requests.compat.urlencode(params, doseq=True)}"
+        print(f"🔗 Fetching data from: {full_url}")  # Print the full URL
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                if getattr(self.transport, "rate_limited", True):
+                    self.rate_limiter.acquire()
+                response = self.transport.get(url, params=params, cookies=self.cookies,
+                                              headers=request_headers, timeout=self.timeout)
+                if response.status_code in RETRY_STATUS_CODES and attempt < self.max_retries:
+                    self._backoff(attempt, response.headers.get("Retry-After"))
+                    continue
+                response.raise_for_status()  # Raises an error for HTTP errors (403, 404, etc.)
+                data = json_backend.loads(response.content)
+                if cache_key is not None:
+                    self.cache.set(cache_key, data, self._cache_ttl(params))
+                return data
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt < self.max_retries:
+                    self._backoff(attempt)
+                    continue
+                print(f"⚠️ Error fetching data from ESPN API: {e}")
+                return None
+            except (requests.exceptions.RequestException, json_backend.JSONDecodeError) as e:
+                print(f"⚠️ Error fetching data from ESPN API: {e}")
+                if response is not None:
+                    print(f"Status Code: {response.status_code}")
+                    print(
+                        f"Response Text: {response.text[:500]}")  # Print first 500 characters of the response for debugging
+                return None  # Returns None instead of crashing
+
+    def _cache_ttl(self, params):
+        """
+        Returns how long a response may be cached.  Data of past seasons and of completed scoring periods never
+        changes, so it is cached without expiry; everything else uses the per-view time-to-live of the cache.
+        :param params: The query parameters of the request.
+        :return: Time-to-live in seconds, or None for data that never expires.
+        """
+        scoring_period_id = params.get("scoringPeriodId")
+        if self.is_complete(int(scoring_period_id) if scoring_period_id is not None else None):
+            return None
+        return self.cache.ttl_for(params)
+
+    def is_complete(self, scoring_period_id: int = None):
+        """
+        Returns whether data of the season, or of one of its scoring periods, can no longer change.
+        Past seasons are complete, as are scoring periods before the current one.
+        :param scoring_period_id: Optional scoring period.  Only the season is checked when omitted.
+        :return: bool
+        """
+        if self.season_id < date.today().year:
+            return True
+        return (scoring_period_id is not None and self.current_scoring_period is not None
+                and scoring_period_id < self.current_scoring_period)
+
+    def _backoff(self, attempt: int, retry_after: str = None):
+        """
+        Waits before the next retry.  If the server sent a Retry-After header, the shared rate limiter is paused
+        for that long so every requester backs off together; otherwise sleeps using exponential backoff with full
+        jitter.
+        :param attempt: The zero-based number of the attempt that just failed.
+        :param retry_after: The Retry-After header of the failed response, if any.
+        :return: None
+        """
+        retry_seconds = parse_retry_after(retry_after)
+        if retry_seconds is not None:
+            self.rate_limiter.pause(retry_seconds)  # The next acquire() waits out the pause
+            return
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** attempt)
+        time.sleep(random.uniform(0, delay))
 
     def get_teams(self):
         """
@@ -59,9 +270,19 @@ class ESPNRequester:
         """
         params = {"view": "mTeam"}
         data = self.fetch_data(params)
+        return self._unwrap(data, "teams")
+
+    def get_history_teams(self):
+        """
+        Returns the team JSON of every season archived under the leagueHistory endpoint (seasons before 2018) with
+        a single request, instead of one request per season.  Archived seasons are complete, so the response is
+        cached permanently when the requester's own season is a past one.
+        :return: Dictionary of season id to list of team JSON, or None if the request failed.
+        """
+        data = self.fetch_data({"view": "mTeam"}, base_url=HISTORY_URL.format(league_id=self.league_id))
         if not data:
             return None
-        return data[0]["teams"] if self.season_id < 2018 else data["teams"]
+        return {season["seasonId"]: season.get("teams", []) for season in data if "seasonId" in season}
 
     def get_daily_stats(self, scoring_period_id: int):
         """
@@ -69,50 +290,57 @@ class ESPNRequester:
         """
         params = {"scoringPeriodId": str(scoring_period_id), "view": "mRoster"}
         data = self.fetch_data(params)  # CHANGED: Uses fetch_data() for error handling
-        if not data:
-            return None
-        return data[0]["teams"] if self.season_id < 2018 else data["teams"]
+        return self._unwrap(data, "teams")
 
     def get_league_settings(self):
         """
-        Fetch league settings and status
+        Fetch league settings, status and schedule
         """
-        params = {"view": "mSettings"}
+        params = {"view": ["mSettings", "mMatchupScore"]}
         data = self.fetch_data(params)  # CHANGED: Uses fetch_data() for better error handling
-        if not data:
-            return None
-        return data[0] if self.season_id < 2018 else data
+        return self._unwrap(data)
+
+    def get_league_bootstrap(self):
+        """
+        Fetch league settings, status, schedule, teams and rosters in a single request by combining the mSettings,
+        mMatchupScore, mTeam and mRoster views.  Every team in the returned "teams" list carries both its mTeam
+        fields and its roster.
+        """
+        params = {"view": ["mSettings", "mMatchupScore", "mTeam", "mRoster"]}
+        data = self.fetch_data(params)
+        return self._unwrap(data)
 
-    def get_player_projections(self):
+    def iter_player_projections(self, path: str = 'kona_player_info.json'):
         """
-        Fetch player projections from local kona_player_info.json file
+        Streams the players of a local kona_player_info.json file one at a time instead of loading the whole file.
+        :param path: Path of the file.
+        :return: A generator of player JSON.  Raises ValueError (or json.JSONDecodeError) if the file is invalid or
+                 truncated, after the players before the error have been yielded, so a caller must not keep a
+                 partial result.
         """
         try:
-            with open('kona_player_info.json', 'r') as f:
-                data = json.load(f)
-            
-            # Debug print
-            print("\nLocal JSON Data:")
-            print(f"Data type: {type(data)}")
-            if isinstance(data, list):
-                print(f"Data length: {len(data)}")
-                if len(data) > 0:
-                    print(f"First item keys: {data[0].keys()}")
-            else:
-                print(f"Data keys: {data.keys()}")
-            
-            players = data[0]["players"] if self.season_id < 2018 else data["players"]
-            print(f"\nNumber of players: {len(players)}")
-            if len(players) > 0:
-                print(f"First player keys: {players[0].keys()}")
-            
-            return players
+            f = open(path, 'r')
         except FileNotFoundError:
-            print("kona_player_info.json file not found")
-            return None
-        except json.JSONDecodeError:
-            print("Error decoding kona_player_info.json")
+            print(f"{path} file not found")
+            return
+        with f:
+            yield from iter_json_array(f, "players")
+
+    def get_player_projections(self, path: str = 'kona_player_info.json'):
+        """
+        Fetch player projections from local kona_player_info.json file.  The file is streamed with
+        iter_player_projections, so only the players are held in memory and never the whole document.  The players
+        are decoded by the standard library, whatever json_backend selects (see iter_json_array).
+        :param path: Path of the file.
+        :return: List of player JSON, or None if the file is missing, invalid or has no players.
+        """
+        try:
+            players = list(self.iter_player_projections(path))
+        except ValueError:
+            print(f"Error decoding {path}")
             return None
+        print(f"\nNumber of players: {len(players)}")
+        return players or None
 
     def get_all_players(self):
         """
@@ -124,15 +352,75 @@ class ESPNRequester:
         filters = {"players": {"filterActive": {"value": True}}}
         headers = {'x-fantasy-filter': json.dumps(filters)}
         data = self.fetch_data(extend='/players', params=params, headers=headers)
-        if not data:
-            return None
-        return data[0]["players"] if self.season_id < 2018 else data["players"]
+        return self._unwrap(data, "players")
+
+    def get_players_page(self, offset: int, limit: int):
+        """
+        Fetch one page of active players, ordered by ownership.
+        :param offset: Number of players to skip.
+        :param limit: Maximum number of players in the page.
+        :return: A list of player JSON, or None if the request failed.
+        """
+        params = {
+            "view": "kona_player_info"
+        }
+        filters = {"players": {"filterActive": {"value": True},
+                               "limit": limit,
+                               "offset": offset,
+                               "sortPercOwned": {"sortPriority": 1, "sortAsc": False},
+                               "sortDraftRanks": {"sortPriority": 100, "sortAsc": True, "value": "STANDARD"}}}
+        headers = {'x-fantasy-filter': json.dumps(filters)}
+        data = self.fetch_data(extend='/players', params=params, headers=headers)
+        return self._unwrap(data, "players")
+
+    def iter_players(self, page_size: int = 250, workers: int = 4, max_pages: int = 100):
+        """
+        Streams all active players page by page.  Up to workers pages are fetched concurrently while the caller
+        consumes earlier pages, and pages are yielded in order.  Players that move between pages while the pool
+        is being paged (ownership changes) are only yielded once.
+        Paging stops at an empty or short page, at a page without new players, or at a page longer than
+        page_size (the filter's limit was ignored, so the page already holds the whole pool).
+        :param page_size: Number of players per request.
+        :param workers: Number of pages fetched concurrently.
+        :param max_pages: Maximum number of pages requested, in case the endpoint never returns a last page.
+        :return: A generator of player JSON.  Raises PlayerPageError if a page still fails after its retries, or if
+                 no page within max_pages ends the pool.
+        """
+        seen = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pages = deque((i * page_size, executor.submit(self.get_players_page, i * page_size, page_size))
+                          for i in range(min(workers, max_pages)))
+            next_page = len(pages)
+            try:
+                while pages:
+                    offset, future = pages.popleft()
+                    page = future.result()
+                    if page is None:
+                        # fetch_data has already retried; try the page once more before giving up on the pool
+                        page = self.get_players_page(offset, page_size)
+                        if page is None:
+                            raise PlayerPageError(f"Could not fetch the players at offset {offset}")
+                    new_players = [player_json for player_json in page if player_json["id"] not in seen]
+                    seen.update(player_json["id"] for player_json in new_players)
+                    if len(page) != page_size or not new_players:
+                        # Last page; the requests for pages after it are no longer needed
+                        for _, pending in pages:
+                            pending.cancel()
+                        pages.clear()
+                    elif next_page < max_pages:
+                        pages.append((next_page * page_size,
+                                      executor.submit(self.get_players_page, next_page * page_size, page_size)))
+                        next_page += 1
+                    elif not pages:
+                        raise PlayerPageError(f"The player pool did not end within {max_pages} pages of {page_size}")
+                    yield from new_players
+            finally:
+                for _, pending in pages:
+                    pending.cancel()
 
     def get_rosters(self):
         params = {
             "view": "mRoster"
         }
         data = self.fetch_data(params)  # CHANGED: Uses fetch_data() for better error handling
-        if not data:
-            return None
-        return data["teams"]
+        return self._unwrap(data, "teams")
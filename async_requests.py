@@ -0,0 +1,218 @@
+import asyncio
+import json
+import random
+import aiohttp
+import json_backend
+from api_requests import ESPNRequester, RETRY_STATUS_CODES, HISTORY_URL
+from cache import ResponseCache
+from rate_limit import TokenBucket, parse_retry_after
+
+
+class AsyncESPNRequester(ESPNRequester):
+    """
+    asyncio version of ESPNRequester built on aiohttp.  It exposes the same getters as coroutines.
+
+    Usage:
+        async with AsyncESPNRequester(league_id, season_id) as req:
+            teams = await req.get_teams()
+    """
+
+    def __init__(self, league_id: int, season_id: int, swid: str = None, espn_s2: str = None,
+                 session: aiohttp.ClientSession = None, max_concurrency: int = 10,
+                 semaphore: asyncio.Semaphore = None, timeout: float = 30, max_retries: int = 3,
+                 backoff_factor: float = 0.5, max_backoff: float = 30, cache: ResponseCache = None,
+                 rate_limiter: TokenBucket = None):
+        """
+        :param session: An existing aiohttp ClientSession to share with other requesters.  A session is created on
+                        the first request when omitted and closed by close().
+        :param max_concurrency: Maximum number of requests in flight at once for this requester.
+        :param semaphore: Optional asyncio Semaphore shared with other requesters to bound their combined
+                          concurrency.  Overrides max_concurrency.
+        :param timeout: Seconds to wait for each request to complete.
+        :param max_retries: Number of times a request is retried after a 429/5xx response or a connection error.
+        :param backoff_factor: Base delay in seconds of the exponential backoff between retries.
+        :param max_backoff: Upper bound in seconds of a single backoff delay.
+        :param cache: Optional ResponseCache consulted before every request.
+        :param rate_limiter: Optional rate_limit.TokenBucket.  Defaults to the process-wide limiter of the API host,
+                             which is shared with synchronous requesters.
+        """
+        super().__init__(league_id, season_id, swid, espn_s2, session=session, pool_size=max_concurrency,
+                         timeout=timeout, max_retries=max_retries, backoff_factor=backoff_factor,
+                         max_backoff=max_backoff, cache=cache, rate_limiter=rate_limiter)
+        self.max_concurrency = max_concurrency
+        self._owns_session = session is None
+        self._semaphore = semaphore
+        # aiohttp cannot send cookies without a value
+        self.cookies = {name: value for name, value in self.cookies.items() if value is not None}
+
+    def _create_session(self, pool_size: int):
+        # aiohttp sessions must be created inside a running event loop, so creation waits for the first request
+        return None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def close(self):
+        """
+        Closes the session if it was created by this requester.
+        :return: None
+        """
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _get_session(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+            self.session = aiohttp.ClientSession(connector=connector)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self.session
+
+    async def fetch_data(self, params, extend='', headers=None, base_url=None):
+        """
+        Coroutine version of ESPNRequester.fetch_data.
+
+        Parameters:
+          - params: dict, query parameters to include in the URL.  List values are sent as repeated parameters.
+          - extend: str, additional URL path to append to the base URL (default is empty).
+          - headers: dict, extra headers to merge with the default headers (default is None).
+          - base_url: str, URL requested instead of the season's base URL (default is None).
+        """
+        base_url = base_url if base_url is not None else self.url
+        url = f"{base_url}{extend}"
+        request_headers = self.headers.copy()
+        if headers:
+            request_headers.update(headers)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ResponseCache.make_key(url, params, request_headers.get("x-fantasy-filter"))
+            data = self.cache.get(cache_key)
+            if data is not None:
+                return data
+
+        # aiohttp takes repeated parameters as a list of pairs
+        query = [(key, str(value)) for key, values in params.items()
+                 for value in (values if isinstance(values, (list, tuple)) else [values])]
+        session = self._get_session()
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.rate_limiter.acquire_async()
+                async with self._semaphore:
+                    async with session.get(url, params=query, cookies=self.cookies,
+                                           headers=request_headers, timeout=timeout) as response:
+                        if response.status in RETRY_STATUS_CODES and attempt < self.max_retries:
+                            retry_after = response.headers.get("Retry-After")
+                            retry = True
+                        else:
+                            retry = False
+                            response.raise_for_status()
+                            data = json_backend.loads(await response.read())
+                if retry:
+                    await self._backoff(attempt, retry_after)
+                    continue
+                if cache_key is not None:
+                    self.cache.set(cache_key, data, self._cache_ttl(params))
+                return data
+            except aiohttp.ClientResponseError as e:
+                print(f"⚠️ Error fetching data from ESPN API: {e}")
+                print(f"Status Code: {e.status}")
+                return None
+            except json_backend.JSONDecodeError as e:
+                print(f"⚠️ Error fetching data from ESPN API: {e}")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt < self.max_retries:
+                    await self._backoff(attempt)
+                    continue
+                print(f"⚠️ Error fetching data from ESPN API: {e!r}")
+                return None
+
+    async def _backoff(self, attempt: int, retry_after: str = None):
+        """
+        Waits before the next retry.  See ESPNRequester._backoff.
+        :param attempt: The zero-based number of the attempt that just failed.
+        :param retry_after: The Retry-After header of the failed response, if any.
+        :return: None
+        """
+        retry_seconds = parse_retry_after(retry_after)
+        if retry_seconds is not None:
+            self.rate_limiter.pause(retry_seconds)
+            return
+        delay = min(self.max_backoff, self.backoff_factor * 2 ** attempt)
+        await asyncio.sleep(random.uniform(0, delay))
+
+    async def get_teams(self):
+        """
+        Returns JSON data for each team in the league
+        :return: dict
+        """
+        data = await self.fetch_data({"view": "mTeam"})
+        return self._unwrap(data, "teams")
+
+    async def get_history_teams(self):
+        """
+        Returns the team JSON of every season archived under the leagueHistory endpoint.
+        See ESPNRequester.get_history_teams.
+        """
+        data = await self.fetch_data({"view": "mTeam"}, base_url=HISTORY_URL.format(league_id=self.league_id))
+        if not data:
+            return None
+        return {season["seasonId"]: season.get("teams", []) for season in data if "seasonId" in season}
+
+    async def get_daily_stats(self, scoring_period_id: int):
+        """
+        Fetch roster and scoring information for a specific scoring period
+        """
+        data = await self.fetch_data({"scoringPeriodId": str(scoring_period_id), "view": "mRoster"})
+        return self._unwrap(data, "teams")
+
+    async def get_league_settings(self):
+        """
+        Fetch league settings, status and schedule
+        """
+        data = await self.fetch_data({"view": ["mSettings", "mMatchupScore"]})
+        return self._unwrap(data)
+
+    async def get_league_bootstrap(self):
+        """
+        Fetch league settings, status, teams and rosters in a single request.
+        See ESPNRequester.get_league_bootstrap.
+        """
+        data = await self.fetch_data({"view": ["mSettings", "mMatchupScore", "mTeam", "mRoster"]})
+        return self._unwrap(data)
+
+    async def get_all_players(self):
+        """
+        Fetch all available players from ESPN
+        """
+        filters = {"players": {"filterActive": {"value": True}}}
+        headers = {'x-fantasy-filter': json.dumps(filters)}
+        data = await self.fetch_data(extend='/players', params={"view": "kona_player_info"}, headers=headers)
+        return self._unwrap(data, "players")
+
+    async def get_players_page(self, offset: int, limit: int):
+        """
+        Fetch one page of active players.  See ESPNRequester.get_players_page.
+        """
+        filters = {"players": {"filterActive": {"value": True},
+                               "limit": limit,
+                               "offset": offset,
+                               "sortPercOwned": {"sortPriority": 1, "sortAsc": False},
+                               "sortDraftRanks": {"sortPriority": 100, "sortAsc": True, "value": "STANDARD"}}}
+        headers = {'x-fantasy-filter': json.dumps(filters)}
+        data = await self.fetch_data(extend='/players', params={"view": "kona_player_info"}, headers=headers)
+        return self._unwrap(data, "players")
+
+    def iter_players(self, page_size: int = 250, workers: int = 4):
+        # The pages of ESPNRequester.iter_players are fetched on threads, which cannot await this requester
+        raise NotImplementedError("AsyncESPNRequester cannot page the player pool; await get_all_players instead")
+
+    async def get_rosters(self):
+        data = await self.fetch_data({"view": "mRoster"})
+        return self._unwrap(data, "teams")
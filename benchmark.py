@@ -0,0 +1,200 @@
+"""
+Benchmarks League construction, daily statistics and projections against a recorded archive of ESPN API traffic,
+so that performance changes can be measured offline against identical payloads.
+
+Record an archive once (needs network access, and swid/espn_s2 for private leagues):
+    python benchmark.py record archive.jsonl.gz --league-id 123456789 --season 2021
+
+Replay it without network access, optionally simulating API latency:
+    python benchmark.py replay archive.jsonl.gz --league-id 123456789 --season 2021 --latency 0.05 --workers 8
+
+Measure the memory held per Player for the recorded player pool:
+    python benchmark.py memory archive.jsonl.gz --league-id 123456789 --season 2021
+
+Compare the JSON backends decoding the recorded player pool:
+    python benchmark.py decode archive.jsonl.gz --league-id 123456789 --season 2021
+"""
+import argparse
+import gc
+import json_backend
+import pandas as pd
+import statistics
+import time
+import tracemalloc
+from api_requests import create_session
+from espn_constant import HITTING_MAP, PITCHING_MAP
+from League import League
+from Player import Player
+from transport import HTTPTransport, RecordingTransport, ReplayTransport
+
+
+def record(archive, league_id, season_id, swid=None, espn_s2=None, workers=8):
+    """
+    Runs every benchmarked code path against the live API and records the traffic.
+    :param archive: Path of the archive to write, gzip compressed if it ends with .gz
+    :return: None
+    """
+    transport = RecordingTransport(archive, HTTPTransport(create_session(workers)))
+    league = League(league_id, season_id, swid=swid, espn_s2=espn_s2, transport=transport)
+    league.get_all_daily_stats(workers=workers)
+
+
+def timed(func, *args, **kwargs):
+    """
+    :return: A tuple of the result of func and the seconds it took to run.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def run_benchmarks(archive, league_id, season_id, latency=0.0, workers=8):
+    """
+    Replays the archive and times each code path.
+    :param archive: Path of an archive written by record.
+    :param latency: Simulated seconds per request.
+    :param workers: Number of workers of the concurrent daily stats benchmark.
+    :return: Dictionary of benchmark name to seconds.
+    """
+    transport = ReplayTransport(archive, latency=latency)
+    results = {}
+    league, results["League construction"] = timed(League, league_id, season_id, transport=transport)
+    (hitting_df, pitching_df), results["get_all_daily_stats (sequential)"] = timed(league.get_all_daily_stats)
+    long_frames, results["get_all_daily_stats (long_format)"] = timed(league.get_all_daily_stats, long_format=True)
+    check_long_round_trip(league, long_frames, (hitting_df, pitching_df))
+    _, results[f"get_all_daily_stats (workers={workers})"] = timed(league.get_all_daily_stats, workers=workers)
+    _, results["get_team_projections"] = timed(league.get_team_projections)
+    _, results["compile_player_projections_df"] = timed(league.compile_player_projections_df)
+    return results
+
+
+def check_long_round_trip(league, long_frames, wide_frames):
+    """
+    Checks that pivoting the long daily frames on every stat gives the wide frames of get_all_daily_stats back.
+    :param long_frames: Tuple of long hitting and pitching frames.
+    :param wide_frames: Tuple of wide hitting and pitching frames of the same scoring periods.
+    :return: None.  Raises AssertionError on a difference.
+    """
+    pivoted = league.pivot_daily_stats(*long_frames, list(HITTING_MAP), list(PITCHING_MAP))
+    for wide, rebuilt in zip(wide_frames, pivoted):
+        # Categories are listed in order of appearance, which the two paths may not share
+        pd.testing.assert_frame_equal(wide, rebuilt, check_categorical=False)
+
+
+def load_player_pool_body(archive):
+    """
+    :return: The raw response body of the recorded kona_player_info request.
+    """
+    transport = ReplayTransport(archive)
+    for record in transport.records.values():
+        if record["params"].get("view") == "kona_player_info":
+            return record["body"]
+    raise ValueError(f"{archive} does not contain a kona_player_info response")
+
+
+def measure_player_memory(body, keep_raw):
+    """
+    Decodes a player pool response, builds a Player for every entry and reports the memory still allocated once
+    the decoded payload itself is released.  With keep_raw=True every Player keeps its JSON alive, which is what
+    the pool retained before raw payloads were dropped.
+    :param body: Raw kona_player_info response body.
+    :param keep_raw: Passed to Player.
+    :return: A tuple of the number of players and the bytes held per player.
+    """
+    gc.collect()
+    tracemalloc.start()
+    data = json_backend.loads(body)
+    players = [Player(player_json, keep_raw=keep_raw) for player_json in data["players"]]
+    del data
+    gc.collect()
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(players), held / max(len(players), 1)
+
+
+def run_memory_benchmarks(archive):
+    """
+    :return: Dictionary of benchmark name to bytes held per player.
+    """
+    body = load_player_pool_body(archive)
+    results = {}
+    for keep_raw in (True, False):
+        count, per_player = measure_player_memory(body, keep_raw)
+        results[f"Player, keep_raw={keep_raw} ({count} players)"] = per_player
+    return results
+
+
+def measure_decoding(body, backend, repeat=5):
+    """
+    Decodes a response body with a JSON backend.
+    :param body: Raw response body as bytes.
+    :param backend: A key of json_backend.BACKENDS.
+    :param repeat: Number of timed runs.
+    :return: A tuple of the median seconds per decode and the peak bytes allocated while decoding.
+    """
+    loads = json_backend.BACKENDS[backend]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loads(body)
+        timings.append(time.perf_counter() - start)
+    gc.collect()
+    tracemalloc.start()
+    data = loads(body)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return statistics.median(timings), peak
+
+
+def run_decoding_benchmarks(archive, repeat=5):
+    """
+    :return: Dictionary of backend name to a tuple of median seconds and peak bytes allocated.
+    """
+    body = load_player_pool_body(archive).encode("utf-8")
+    return {f"{backend} ({len(body) / 2 ** 20:.1f} MiB)": measure_decoding(body, backend, repeat)
+            for backend in json_backend.BACKENDS}
+
+
+def print_decoding_results(results):
+    width = max(len(name) for name in results)
+    for name, (seconds, peak) in results.items():
+        print(f"{name:<{width}}  {seconds:10.4f} s  {peak / 2 ** 20:10.1f} MiB allocated")
+
+
+def print_memory_results(results):
+    width = max(len(name) for name in results)
+    for name, per_player in results.items():
+        print(f"{name:<{width}}  {per_player:10.0f} bytes/player")
+
+
+def print_results(results):
+    width = max(len(name) for name in results)
+    for name, seconds in results.items():
+        print(f"{name:<{width}}  {seconds:10.4f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["record", "replay", "memory", "decode"])
+    parser.add_argument("archive")
+    parser.add_argument("--league-id", type=int, required=True)
+    parser.add_argument("--season", type=int, required=True)
+    parser.add_argument("--swid")
+    parser.add_argument("--espn-s2")
+    parser.add_argument("--latency", type=float, default=0.0, help="simulated seconds per request when replaying")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        record(args.archive, args.league_id, args.season, args.swid, args.espn_s2, args.workers)
+    elif args.mode == "memory":
+        print_memory_results(run_memory_benchmarks(args.archive))
+    elif args.mode == "decode":
+        print_decoding_results(run_decoding_benchmarks(args.archive))
+    else:
+        print_results(run_benchmarks(args.archive, args.league_id, args.season, args.latency, args.workers))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+import hashlib
+import json
+import json_backend
+import os
+import tempfile
+import threading
+import time
+
+# Default number of seconds a cached response of each ESPN view stays fresh.
+# Views that are not listed use ResponseCache.default_ttl.
+DEFAULT_VIEW_TTLS = {
+    "mSettings": 6 * 60 * 60,
+    "mTeam": 10 * 60,
+    "mRoster": 5 * 60,
+    "mMatchupScore": 5 * 60,
+    "kona_player_info": 60 * 60,
+}
+
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of decoded ESPN API responses.
+
+    Each response is stored as a JSON file named after a hash of the request URL, query parameters and
+    x-fantasy-filter header.  Entries carry their own expiry time; entries stored with a ttl of None never expire.
+    When the total size of the cache directory exceeds max_bytes the least recently used entries are removed.
+    """
+
+    def __init__(self, directory: str = ".espn_cache", max_bytes: int = 512 * 1024 * 1024,
+                 view_ttls: dict = None, default_ttl: float = 5 * 60):
+        """
+        :param directory: Directory holding the cache files.  Created if it does not exist.
+        :param max_bytes: Maximum total size of the cache files before old entries are evicted.
+        :param view_ttls: Dictionary of ESPN view name to time-to-live in seconds, merged over DEFAULT_VIEW_TTLS.
+        :param default_ttl: Time-to-live in seconds of views that have no entry in view_ttls.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.view_ttls = {**DEFAULT_VIEW_TTLS, **(view_ttls or {})}
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._entry_paths())
+
+    @staticmethod
+    def make_key(url: str, params: dict, fantasy_filter: str = None):
+        """
+        Builds the cache key of a request.
+        :param url: The request URL without query string.
+        :param params: The query parameters of the request.
+        :param fantasy_filter: The value of the x-fantasy-filter header, if any.
+        :return: A hex digest identifying the request.
+        """
+        normalized = json.dumps([url, sorted((str(k), str(v)) for k, v in params.items()), fantasy_filter])
+        return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, params: dict):
+        """
+        Returns the time-to-live of a request based on the ESPN views it asks for.
+        When several views are combined the shortest time-to-live applies.
+        :param params: The query parameters of the request.
+        :return: Time-to-live in seconds.
+        """
+        views = params.get("view", [])
+        if isinstance(views, str):
+            views = [views]
+        ttls = [self.view_ttls.get(view, self.default_ttl) for view in views]
+        return min(ttls) if ttls else self.default_ttl
+
+    @property
+    def stats(self):
+        """
+        :return: Dictionary with the hit and miss counters and the current size of the cache in bytes.
+        """
+        return {"hits": self.hits, "misses": self.misses, "bytes": self._size}
+
+    def get(self, key: str):
+        """
+        Returns the cached data for key, or None if it is missing or expired.
+        :param key: A key built by make_key.
+        :return: The decoded JSON data or None.
+        """
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, "rb") as f:
+                    entry = json_backend.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self.misses += 1
+                return None
+            expires = entry.get("expires")
+            if expires is not None and expires < time.time():
+                self._remove(path)
+                self.misses += 1
+                return None
+            os.utime(path)  # Marks the entry as recently used for eviction
+            self.hits += 1
+            return entry["data"]
+
+    def set(self, key: str, data, ttl: float = None):
+        """
+        Stores data under key.
+        :param key: A key built by make_key.
+        :param data: JSON serializable data.
+        :param ttl: Seconds until the entry expires.  None stores the entry permanently.
+        :return: None
+        """
+        path = self._path(key)
+        entry = {"expires": None if ttl is None else time.time() + ttl, "data": data}
+        with self._lock:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(entry, f)
+            if os.path.exists(path):
+                self._size -= os.path.getsize(path)
+            os.replace(tmp_path, path)
+            self._size += os.path.getsize(path)
+            self._evict()
+
+    def clear(self):
+        """
+        Removes every entry from the cache and resets the counters.
+        :return: None
+        """
+        with self._lock:
+            for path in self._entry_paths():
+                self._remove(path)
+            self.hits = 0
+            self.misses = 0
+
+    def _path(self, key: str):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _entry_paths(self):
+        return [os.path.join(self.directory, name) for name in os.listdir(self.directory) if name.endswith(".json")]
+
+    def _remove(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            self._size -= size
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the cache fits in max_bytes.
+        """
+        if self._size <= self.max_bytes:
+            return
+        for path in sorted(self._entry_paths(), key=os.path.getmtime):
+            if self._size <= self.max_bytes:
+                break
+            self._remove(path)
@@ -0,0 +1,84 @@
+import sqlite3
+import time
+import pandas as pd
+
+
+class DailyStatsStore:
+    """
+    Persistent SQLite store of the daily hitting and pitching statistics returned by League.get_all_daily_stats.
+
+    Rows are keyed by league, season and scoring period.  The periods table records which scoring periods have
+    been fetched and whether they were complete at the time, so League.sync_daily_stats only has to download
+    periods that are missing or were still in progress.
+    """
+
+    TABLES = ("hitting", "pitching")
+
+    def __init__(self, path: str = "daily_stats.db"):
+        """
+        :param path: Path of the SQLite database file.  Created if it does not exist.
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS periods ("
+            "league_id INTEGER, season_id INTEGER, scoring_period INTEGER, complete INTEGER, fetched_at REAL, "
+            "PRIMARY KEY (league_id, season_id, scoring_period))")
+        self.connection.commit()
+
+    def close(self):
+        self.connection.close()
+
+    def complete_periods(self, league_id: int, season_id: int):
+        """
+        :return: The set of scoring periods stored as complete for the league and season.
+        """
+        rows = self.connection.execute(
+            "SELECT scoring_period FROM periods WHERE league_id = ? AND season_id = ? AND complete = 1",
+            (league_id, season_id))
+        return {row[0] for row in rows}
+
+    def save_period(self, league_id: int, season_id: int, scoring_period: int, hitting: pd.DataFrame,
+                    pitching: pd.DataFrame, complete: bool):
+        """
+        Replaces the stored statistics of one scoring period.
+        :param hitting: Hitting DataFrame of the period, as returned by League.update_daily_statistics.
+        :param pitching: Pitching DataFrame of the period.
+        :param complete: Whether the period is finished and never needs to be fetched again.
+        :return: None
+        """
+        key = (league_id, season_id, scoring_period)
+        with self.connection:
+            for table, frame in zip(self.TABLES, (hitting, pitching)):
+                if self._table_exists(table):
+                    self.connection.execute(
+                        f"DELETE FROM {table} WHERE league_id = ? AND season_id = ? AND scoring_period = ?", key)
+                if frame.empty:
+                    continue
+                frame = frame.copy()
+                frame.insert(0, "league_id", league_id)
+                frame.insert(1, "season_id", season_id)
+                frame.insert(2, "scoring_period", scoring_period)
+                frame.to_sql(table, self.connection, if_exists="append", index=False)
+            self.connection.execute("INSERT OR REPLACE INTO periods VALUES (?, ?, ?, ?, ?)",
+                                    (*key, int(complete), time.time()))
+
+    def load(self, league_id: int, season_id: int):
+        """
+        Reads every stored period of the league and season.
+        :return: A tuple of hitting and pitching DataFrames ordered by scoring period.
+        """
+        frames = []
+        for table in self.TABLES:
+            if not self._table_exists(table):
+                frames.append(pd.DataFrame())
+                continue
+            frame = pd.read_sql_query(
+                f"SELECT * FROM {table} WHERE league_id = ? AND season_id = ? ORDER BY scoring_period, rowid",
+                self.connection, params=(league_id, season_id))
+            frames.append(frame.drop(columns=["league_id", "season_id", "scoring_period"]))
+        return frames[0], frames[1]
+
+    def _table_exists(self, table: str):
+        row = self.connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return row.fetchone() is not None
@@ -0,0 +1,83 @@
+"""
+JSON decoding backend for ESPN payloads.
+
+The fastest installed decoder is selected on import: orjson when it is available, otherwise the standard library.
+Both accept raw bytes.  orjson decodes them directly, so response bodies and files are never copied into an
+intermediate str; the standard library decodes the bytes to a str first.
+Decoding errors of every backend are json.JSONDecodeError (orjson's error subclasses it).
+Files streamed item by item (api_requests.iter_json_array) are decoded by the standard library, since the backends
+here only decode complete documents.
+
+    import json_backend
+    data = json_backend.loads(response.content)
+"""
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSONDecodeError = json.JSONDecodeError
+
+# Backend name -> function decoding bytes or str
+BACKENDS = {"json": json.loads}
+if orjson is not None:
+    BACKENDS["orjson"] = orjson.loads
+
+_backend = "orjson" if orjson is not None else "json"
+_loads = BACKENDS[_backend]
+
+
+def register_backend(name: str, loads):
+    """
+    Makes a decoder available to set_backend.
+    :param name: Backend name.
+    :param loads: Function decoding bytes or str into Python objects, raising a ValueError subclass on bad input.
+    :return: None
+    """
+    BACKENDS[name] = loads
+
+
+def set_backend(name: str):
+    """
+    Selects the decoder used by loads and load.
+    :param name: A key of BACKENDS, such as "orjson" or "json".
+    :return: None
+    """
+    global _backend, _loads
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend {name!r}, available: {', '.join(BACKENDS)}")
+    _backend = name
+    _loads = BACKENDS[name]
+
+
+def get_backend():
+    """
+    :return: The name of the selected backend.
+    """
+    return _backend
+
+
+def loads(data):
+    """
+    Decodes a JSON document.
+    :param data: bytes or str.
+    :return: The decoded object.
+    """
+    try:
+        return _loads(data)
+    except JSONDecodeError:
+        raise
+    except ValueError as e:
+        # Registered backends may raise plain ValueErrors; callers only need to handle JSONDecodeError
+        raise JSONDecodeError(str(e), data if isinstance(data, str) else "", 0) from e
+
+
+def load(f):
+    """
+    Decodes a JSON file.  Open it in binary mode to avoid decoding the text first.
+    :param f: File object.
+    :return: The decoded object.
+    """
+    return loads(f.read())
@@ -0,0 +1,100 @@
+"""
+Loads the team records of many seasons of a league.
+
+Only the mTeam view is requested.  Seasons from 2018 on are fetched concurrently over one shared session, and every
+earlier season comes from a single leagueHistory request.  With a ResponseCache, completed seasons are cached
+permanently, so only the current season is downloaded again on later runs.
+"""
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from api_requests import ESPNRequester, create_session, HISTORY_END_SEASON
+
+RECORD_COLUMNS = ["Season", "SWID", "Team ID", "Team Name", "wins", "losses", "ties"]
+
+
+def fetch_season_teams(league_id, seasons, swid=None, espn_s2=None, session=None, cache=None, workers: int = 8):
+    """
+    Fetches the mTeam team JSON of several seasons concurrently.
+    :param league_id: ESPN league id.
+    :param seasons: Iterable of season ids.
+    :param session: Optional requests Session.  A pooled session of workers connections is created when omitted.
+    :param cache: Optional cache.ResponseCache.  Past seasons are stored without expiry.
+    :param workers: Number of concurrent requests.
+    :return: Dictionary of season id to list of team JSON, in season order.  Seasons that could not be fetched are
+             missing and reported.
+    """
+    seasons = sorted(set(seasons))
+    session = session if session is not None else create_session(workers)
+
+    def requester(season):
+        return ESPNRequester(league_id, season, swid, espn_s2, session=session, cache=cache)
+
+    def fetch_season(season):
+        return season, requester(season).get_teams()
+
+    def fetch_history():
+        # Requested as the oldest season, which is complete, so the response never expires in the cache
+        return requester(archived[0]).get_history_teams() or {}
+
+    archived = [season for season in seasons if season < HISTORY_END_SEASON]
+    current = [season for season in seasons if season >= HISTORY_END_SEASON]
+    teams = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        history = executor.submit(fetch_history) if archived else None
+        season_futures = [executor.submit(fetch_season, season) for season in current]
+        if history is not None:
+            history_teams = history.result()
+            # Seasons the leagueHistory response does not include are requested one by one
+            missing = [season for season in archived if season not in history_teams]
+            season_futures += [executor.submit(fetch_season, season) for season in missing]
+            teams.update((season, history_teams[season]) for season in archived if season in history_teams)
+        for future in season_futures:
+            season, season_teams = future.result()
+            if season_teams:
+                teams[season] = season_teams
+    failed = [season for season in seasons if season not in teams]
+    if failed:
+        print(f"⚠️ Could not fetch the teams of seasons {failed}; their records are not included")
+    return {season: teams[season] for season in seasons if season in teams}
+
+
+def team_records_frame(season_teams: dict):
+    """
+    Flattens the overall record of every team of every season into one DataFrame.
+    :param season_teams: Dictionary of season id to list of team JSON, as returned by fetch_season_teams.
+    :return: DataFrame with the RECORD_COLUMNS, one row per team and season.
+    """
+    rows = []
+    for season, teams in season_teams.items():
+        for team in teams:
+            record = team.get("record", {}).get("overall", {})
+            # Archived seasons may lack primaryOwner and name
+            owner = team.get("primaryOwner") or next(iter(team.get("owners") or []), None)
+            name = team.get("name") or f"{team.get('location', '')} {team.get('nickname', '')}".strip()
+            rows.append((season, owner, team.get("id"), name, record.get("wins", 0), record.get("losses", 0),
+                         record.get("ties", 0)))
+    return pd.DataFrame(rows, columns=RECORD_COLUMNS)
+
+
+def aggregate_records(records: pd.DataFrame):
+    """
+    Sums the records of each manager over every season.
+    :param records: DataFrame built by team_records_frame.
+    :return: DataFrame indexed by SWID in order of first appearance, with the summed wins, losses and ties and the
+             team_name and id of the manager's latest season.  Teams without an owner cannot be attributed to a
+             manager; they are reported and left out.
+    """
+    unowned = records["SWID"].isna()
+    if unowned.any():
+        teams = ", ".join(f"{season} team {team_id}"
+                          for season, team_id in records.loc[unowned, ["Season", "Team ID"]].itertuples(index=False))
+        print(f"⚠️ No owner found for {teams}; their records are not included")
+        records = records[~unowned]
+    records = records.sort_values("Season", kind="stable")
+    grouped = records.groupby("SWID", sort=False)
+    df = grouped[["wins", "losses", "ties"]].sum()
+    latest = grouped[["Team Name", "Team ID"]].last()
+    df["team_name"] = latest["Team Name"]
+    df["id"] = latest["Team ID"]
+    df.index.name = "SWID"
+    return df
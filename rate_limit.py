@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+
+# Default limits of the per-host limiters created by get_rate_limiter
+DEFAULT_RATE = 5.0  # requests per second
+DEFAULT_BURST = 10
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+_defaults = {"rate": DEFAULT_RATE, "burst": DEFAULT_BURST}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket.  Tokens refill at rate per second up to burst.  Callers reserve a token and wait
+    until it is due, so concurrent callers are spaced out instead of retrying against each other.
+    A server-requested pause (Retry-After) delays every caller sharing the bucket.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        """
+        :param rate: Sustained number of requests per second.
+        :param burst: Number of requests that may be sent back to back after an idle period.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()  # Time up to which tokens have been refilled
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        Takes a token and returns how long the caller has to wait before using it.
+        :return: Seconds to wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now > self._updated:
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+            self._tokens -= 1
+            return (self._updated - now) + max(0.0, -self._tokens) / self.rate
+
+    def acquire(self):
+        """
+        Blocks until a request may be sent.
+        :return: None
+        """
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """
+        Waits without blocking the event loop until a request may be sent.
+        :return: None
+        """
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def pause(self, seconds: float):
+        """
+        Stops handing out tokens for the given number of seconds, for instance after a Retry-After header.
+        :param seconds: Length of the pause.
+        :return: None
+        """
+        with self._lock:
+            resume = time.monotonic() + seconds
+            if resume > self._updated:
+                self._tokens = min(self._tokens, 0.0)
+                self._updated = resume
+
+
+def configure_rate_limit(rate: float, burst: int = None, host: str = None):
+    """
+    Sets the request rate of one host, or of every host when host is None.
+    :param rate: Sustained number of requests per second.
+    :param burst: Maximum burst size.  Defaults to twice the rate, and at least 1.
+    :param host: Host name such as "lm-api-reads.fantasy.espn.com".
+    :return: None
+    """
+    if burst is None:
+        burst = max(1, int(rate * 2))
+    with _limiters_lock:
+        if host is None:
+            _defaults.update(rate=rate, burst=burst)
+            _limiters.clear()
+        else:
+            _limiters[host] = TokenBucket(rate, burst)
+
+
+def get_rate_limiter(host: str):
+    """
+    Returns the process-wide limiter of a host, creating it with the default limits if needed.
+    Every requester talking to the same host shares the returned limiter.
+    :param host: Host name.
+    :return: TokenBucket
+    """
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = TokenBucket(_defaults["rate"], _defaults["burst"])
+        return _limiters[host]
+
+
+def parse_retry_after(value: str):
+    """
+    Parses a Retry-After header given either as seconds or as an HTTP date.
+    :param value: The header value, or None.
+    :return: Seconds to wait, or None if the header is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,155 @@
+"""
+Incremental evaluation of roster moves against projected roto standings.
+
+Every team's projected component totals (such as H, AB, ER and OUTS, see roto.component_stats) are cached, so a move
+is the difference of the projections of the players it adds and drops.  Only the categories that depend on a changed
+component are recomputed and re-ranked, and rate categories stay exact because they are recomputed from the
+components instead of being combined from player rates.
+"""
+import numpy as np
+from roto import category_goodness, category_values, component_stats, roto_points
+
+
+class RosterEvaluator:
+    """
+    Projected roto standings of a set of rosters, with the category values and points of every team cached.
+    """
+
+    def __init__(self, means: np.ndarray, player_ids: list, owners: list, team_ids: list, categories: dict,
+                 stat_ids: list):
+        """
+        :param means: players x stat_ids array of projected totals, 0 where a player has no projection.
+        :param player_ids: Player id of each row of means.  Free agents may be included with an owner of None.
+        :param owners: Team id owning each player, or None.
+        :param team_ids: Team ids of the league.
+        :param categories: Dictionary of category stat id to isReverseItem (True when lower is better).
+        :param stat_ids: Stat id of each column of means.  Must include roto.component_stats(categories).
+        """
+        self.means = np.asarray(means, dtype=np.float64)
+        self.rows = {player_id: row for row, player_id in enumerate(player_ids)}
+        self.team_ids = list(team_ids)
+        self.team_index = {team_id: index for index, team_id in enumerate(self.team_ids)}
+        self.categories = list(categories)
+        self.reverse = np.array([categories[stat_id] for stat_id in self.categories], dtype=bool)
+        self.stat_ids = list(stat_ids)
+
+        # Components each category depends on, to find the categories a move changes
+        position = {stat_id: i for i, stat_id in enumerate(self.stat_ids)}
+        self.depends = np.zeros((len(self.categories), len(self.stat_ids)), dtype=bool)
+        for index, stat_id in enumerate(self.categories):
+            self.depends[index, [position[component] for component in component_stats([stat_id])]] = True
+
+        self.owners = {}
+        ownership = np.zeros((len(self.team_ids), len(player_ids)))
+        for row, (player_id, team_id) in enumerate(zip(player_ids, owners)):
+            if team_id in self.team_index:
+                self.owners[player_id] = team_id
+                ownership[self.team_index[team_id], row] = 1
+        self.totals = ownership @ self.means
+        self.values = category_values(self.totals, self.stat_ids, self.categories)
+        self.points = roto_points(self.values, self.reverse)
+
+    @property
+    def total_points(self):
+        """
+        :return: Array of every team's total roto points.
+        """
+        return self.points.sum(axis=-1)
+
+    def move_deltas(self, moves: dict):
+        """
+        :param moves: Dictionary of team id to a tuple of the player ids the team adds and the player ids it drops.
+                      Added players must be free agents or be dropped by another team of the moves.
+        :return: teams x stat_ids array of the change of every team's component totals.
+        """
+        deltas = np.zeros_like(self.totals)
+        released = set()
+        for team_id, (added, dropped) in moves.items():
+            team = self.team_index[team_id]
+            for player_id in dropped:
+                if self.owners.get(player_id) != team_id:
+                    raise ValueError(f"Player {player_id} is not on team {team_id}")
+                released.add(player_id)
+                deltas[team] -= self.means[self.rows[player_id]]
+        claimed = set()
+        for team_id, (added, dropped) in moves.items():
+            team = self.team_index[team_id]
+            for player_id in added:
+                owner = self.owners.get(player_id)
+                if owner == team_id:
+                    raise ValueError(f"Player {player_id} is already on team {team_id}")
+                if owner is not None and player_id not in released:
+                    raise ValueError(f"Player {player_id} is on team {owner} and is not traded to team {team_id}")
+                if player_id in claimed:
+                    raise ValueError(f"Player {player_id} is added by more than one team")
+                claimed.add(player_id)
+                deltas[team] += self.means[self.rows[player_id]]
+        return deltas
+
+    def evaluate(self, moves: dict):
+        """
+        Computes the standings after a set of moves without applying them.
+        :param moves: Dictionary of team id to a tuple of the player ids the team adds and the player ids it drops.
+                      A trade lists the same players on both sides, an add/drop a single team.
+        :return: A tuple of the teams x categories values and points after the moves.
+        """
+        return self._evaluate(self.move_deltas(moves))[1:]
+
+    def apply(self, moves: dict):
+        """
+        Applies a set of moves to the cached totals, values and points.
+        :param moves: See evaluate.
+        :return: None
+        """
+        self.totals, self.values, self.points = self._evaluate(self.move_deltas(moves))
+        for team_id, (added, dropped) in moves.items():
+            for player_id in dropped:
+                self.owners.pop(player_id, None)
+        for team_id, (added, dropped) in moves.items():
+            for player_id in added:
+                self.owners[player_id] = team_id
+
+    def _evaluate(self, deltas: np.ndarray):
+        """
+        :param deltas: teams x stat_ids array of component changes.
+        :return: A tuple of the totals, values and points after the change.
+        """
+        teams = np.flatnonzero(deltas.any(axis=1))
+        changed = np.flatnonzero((self.depends & deltas.any(axis=0)).any(axis=1))
+        totals = self.totals + deltas
+        values = self.values.copy()
+        points = self.points.copy()
+        if len(changed):
+            affected = [self.categories[index] for index in changed]
+            values[np.ix_(teams, changed)] = category_values(totals[teams], self.stat_ids, affected)
+            points[:, changed] = roto_points(values[:, changed], self.reverse[changed])
+        return totals, values, points
+
+    def score_candidates(self, team_id, candidate_ids: list, drop_id=None):
+        """
+        Scores many single-player additions to one team in one batch, each optionally replacing a rostered player.
+        The other teams' values are fixed, so every candidate is ranked against them column by column.
+        :param team_id: Team id of the team adding a player.
+        :param candidate_ids: Player ids of the candidates, such as every free agent.  Rostered players are
+                              rejected, since their stats are already counted for their team.
+        :param drop_id: Player id of the rostered player each candidate replaces, or None to only add.
+        :return: A tuple of the candidates x categories values and points of the team with each candidate.
+        """
+        rostered = [player_id for player_id in candidate_ids if player_id in self.owners]
+        if rostered:
+            raise ValueError(f"Players {rostered} are not free agents")
+        team = self.team_index[team_id]
+        base = self.totals[team]
+        if drop_id is not None:
+            base = base + self.move_deltas({team_id: ((), (drop_id,))})[team]
+        rows = np.fromiter((self.rows[player_id] for player_id in candidate_ids), dtype=np.intp,
+                           count=len(candidate_ids))
+        values = category_values(base + self.means[rows], self.stat_ids, self.categories)
+
+        # Points of the team in each category among the other teams, as roto_points awards them
+        others = np.delete(self.values, team, axis=0)
+        goodness = category_goodness(values, self.reverse)[:, None, :]
+        other_goodness = category_goodness(others, self.reverse)[None, :, :]
+        worse = (other_goodness < goodness).sum(axis=1)
+        ties = (other_goodness == goodness).sum(axis=1)
+        return values, worse + (ties + 2) / 2
@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+from espn_constant import HITTING_MAP, PITCHING_MAP
+
+
+STAT_NAMES = {**HITTING_MAP, **PITCHING_MAP}
+# Rate categories as (numerator, denominator, scale): value = scale * sum(numerator) / sum(denominator), where
+# numerator and denominator are dictionaries of component stat id to weight.  Rates are always recomputed from
+# cumulative components; averaging daily rates would weight a 1 AB day like a 5 AB day.
+RATE_STATS = {
+    2: ({1: 1}, {0: 1}, 1),  # AVG = H / AB
+    9: ({8: 1}, {0: 1}, 1),  # SLG = TB / AB
+    17: ({1: 1, 10: 1, 12: 1}, {0: 1, 10: 1, 12: 1, 13: 1}, 1),  # OBP = (H + BB + HBP) / (AB + BB + HBP + SF)
+    38: ({37: 1}, {35: 1, 39: -1, 42: -1}, 1),  # OBA = H / (TBF - BB - HBP), ignoring sacrifices
+    41: ({37: 1, 39: 1}, {34: 1}, 3),  # WHIP = (H + BB) / IP, with IP = OUTS / 3
+    43: ({37: 1, 39: 1, 42: 1}, {35: 1}, 1),  # OOBP = (H + BB + HBP) / TBF
+    47: ({45: 1}, {34: 1}, 27),  # ERA = 9 * ER / IP
+    49: ({48: 1}, {34: 1}, 27),  # K/9 = 9 * K / IP
+    55: ({53: 1}, {53: 1, 54: 1}, 1),  # WPCT = W / (W + L)
+    59: ({57: 1}, {57: 1, 58: 1}, 1),  # SV% = SV / (SV + BS)
+}
+# Categories that are the sum of two rate categories
+RATE_SUMS = {18: (17, 9)}  # OPS = OBP + SLG
+
+
+def component_stats(categories):
+    """
+    :param categories: Iterable of category stat ids.
+    :return: Sorted list of the stat ids that have to be summed to compute the categories.
+    """
+    components = set()
+    for stat_id in categories:
+        for rate_id in RATE_SUMS.get(stat_id, (stat_id,)):
+            if rate_id in RATE_STATS:
+                numerator, denominator, _ = RATE_STATS[rate_id]
+                components.update(numerator)
+                components.update(denominator)
+            else:
+                components.add(rate_id)
+    return sorted(components)
+
+
+def category_names(categories):
+    """
+    :param categories: Iterable of category stat ids.
+    :return: List of column names.  Pitching categories sharing a name with a hitting category, such as HR or BB,
+             get a " (P)" suffix.
+    """
+    categories = list(categories)
+    names = [STAT_NAMES.get(stat_id, str(stat_id)) for stat_id in categories]
+    return [f"{name} (P)" if names.count(name) > 1 and stat_id in PITCHING_MAP else name
+            for stat_id, name in zip(categories, names)]
+
+
+def category_values(totals: np.ndarray, stat_ids: list, categories):
+    """
+    Computes category values from summed components.
+    :param totals: Array whose last axis holds the components listed in stat_ids.
+    :param stat_ids: Stat id of each entry of the last axis of totals.
+    :param categories: Iterable of category stat ids.
+    :return: Array of the same shape as totals except for the last axis, which has one entry per category.  Rates
+             with a zero denominator are NaN.
+    """
+    position = {stat_id: i for i, stat_id in enumerate(stat_ids)}
+
+    def weighted(weights):
+        return sum(weight * totals[..., position[stat_id]] for stat_id, weight in weights.items())
+
+    def rate(stat_id):
+        numerator, denominator, scale = RATE_STATS[stat_id]
+        bottom = weighted(denominator)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(bottom != 0, scale * weighted(numerator) / bottom, np.nan)
+
+    values = []
+    for stat_id in categories:
+        if stat_id in RATE_SUMS:
+            values.append(sum(rate(rate_id) for rate_id in RATE_SUMS[stat_id]))
+        elif stat_id in RATE_STATS:
+            values.append(rate(stat_id))
+        else:
+            values.append(totals[..., position[stat_id]])
+    return np.stack(values, axis=-1)
+
+
+def roto_points(values: np.ndarray, reverse):
+    """
+    Awards roto points per category across teams: the best team gets as many points as there are teams and the
+    worst gets 1.  Tied teams split the points of the places they occupy.  Missing values (NaN) rank last.
+    :param values: Array of shape (teams, ..., categories).
+    :param reverse: Boolean per category, True when lower values are better (ESPN's isReverseItem).
+    :return: float64 array of the same shape as values.
+    """
+    goodness = category_goodness(values, reverse)
+    # Teams are few, so comparing every pair of teams is cheaper than sorting
+    worse = (goodness[None, ...] < goodness[:, None, ...]).sum(axis=1)
+    ties = (goodness[None, ...] == goodness[:, None, ...]).sum(axis=1)
+    return worse + (ties + 1) / 2
+
+
+def category_goodness(values: np.ndarray, reverse):
+    """
+    Turns category values into higher-is-better values, with missing values (NaN) below everything else.
+    :param values: Array whose last axis holds categories.
+    :param reverse: Boolean per category, True when lower values are better.
+    :return: float64 array of the same shape as values.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    goodness = np.where(np.asarray(reverse, dtype=bool), -values, values)
+    return np.where(np.isnan(goodness), -np.inf, goodness)
+
+
+def build_daily_cube(hitting_df: pd.DataFrame, pitching_df: pd.DataFrame, stat_ids: list, team_ids=None,
+                     scoring_periods=None):
+    """
+    Sums the daily player stats of each team into a team x scoring period x stat cube.
+    :param hitting_df: Daily hitting DataFrame from League.get_all_daily_stats.
+    :param pitching_df: Daily pitching DataFrame from League.get_all_daily_stats.
+    :param stat_ids: Stat ids of the cube's last axis, from HITTING_MAP or PITCHING_MAP.
+    :param team_ids: Teams of the first axis.  Defaults to every team in the frames.
+    :param scoring_periods: Scoring periods of the second axis.  Defaults to every period from 1 to the last one in
+                            the frames, so periods without games are present with zero totals.
+    :return: A tuple of the float64 cube, the team ids and the scoring periods.
+    """
+    frames = []
+    for frame, stat_map in ((hitting_df, HITTING_MAP), (pitching_df, PITCHING_MAP)):
+        columns = {stat_map[stat_id]: stat_id for stat_id in stat_ids if stat_id in stat_map}
+        if frame.empty or not columns:
+            continue
+        daily = frame.groupby(["Team ID", "Scoring Period"], observed=True)[list(columns)].sum()
+        frames.append(daily.rename(columns=columns))
+    totals = pd.concat(frames, axis=1).fillna(0) if frames else pd.DataFrame(columns=stat_ids)
+
+    if team_ids is None:
+        team_ids = sorted(totals.index.get_level_values("Team ID").unique()) if len(totals) else []
+    if scoring_periods is None:
+        last = totals.index.get_level_values("Scoring Period").max() if len(totals) else 0
+        scoring_periods = range(1, int(last) + 1)
+    team_ids, scoring_periods = list(team_ids), list(scoring_periods)
+    grid = pd.MultiIndex.from_product([team_ids, scoring_periods], names=["Team ID", "Scoring Period"])
+    totals = totals.reindex(index=grid, columns=stat_ids, fill_value=0)
+    cube = totals.to_numpy(dtype=np.float64).reshape(len(team_ids), len(scoring_periods), len(stat_ids))
+    return cube, team_ids, scoring_periods
+
+
+def roto_standings_series(cube: np.ndarray, team_ids: list, scoring_periods: list, stat_ids: list,
+                          categories: dict):
+    """
+    Computes the roto standings after every scoring period in one pass: cumulative category totals, rates from
+    cumulative components, roto points per category and total points.
+    :param cube: team x scoring period x stat array of daily totals, as built by build_daily_cube.
+    :param team_ids: Team id of each entry of the first axis.
+    :param scoring_periods: Scoring period of each entry of the second axis.
+    :param stat_ids: Stat id of each entry of the last axis.  Must include component_stats(categories).
+    :param categories: Dictionary of category stat id to isReverseItem (True when lower is better), such as
+                       League.hitting_categories merged with League.pitching_categories.
+    :return: DataFrame indexed by Scoring Period and Team ID with a value column and a "<name> Points" column per
+             category, and a Total Points column.
+    """
+    category_ids = list(categories)
+    cumulative = np.cumsum(cube, axis=1)
+    values = category_values(cumulative, stat_ids, category_ids)
+    points = roto_points(values, [categories[stat_id] for stat_id in category_ids])
+    total = points.sum(axis=-1)
+
+    # Reorder to (period, team) so each period's standings are contiguous
+    names = category_names(category_ids)
+    rows = len(scoring_periods) * len(team_ids)
+    data = {}
+    data.update(zip(names, values.transpose(1, 0, 2).reshape(rows, -1).T))
+    data.update(zip((f"{name} Points" for name in names), points.transpose(1, 0, 2).reshape(rows, -1).T))
+    data["Total Points"] = total.T.reshape(rows)
+    index = pd.MultiIndex.from_product([scoring_periods, team_ids], names=["Scoring Period", "Team ID"])
+    return pd.DataFrame(data, index=index)
@@ -0,0 +1,152 @@
+"""
+Monte Carlo season simulation from player projections.
+
+Each simulated season draws, for every rostered player, a playing time factor with mean 1 that scales the player's
+projected PA (hitters) or IP (pitchers) together with every stat that depends on them, and then every projected
+component stat from a Poisson distribution whose mean is the projection scaled by that factor.  Component stats are
+summed by roster and turned into the league's categories with the roto module, so rate categories come from
+simulated components rather than from projected rates.
+
+Simulations run in chunks of (simulations x players x components) arrays and can be split across a process pool.
+"""
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from roto import category_goodness, category_values, roto_points
+
+# Poisson means from which a rounded normal distribution is drawn instead, which is several times faster to sample
+# and indistinguishable at these sizes
+NORMAL_APPROXIMATION_MEAN = 30
+
+
+class SeasonSimulator:
+    """
+    Simulates roto standings and head-to-head category matchups from projected player stats.
+    """
+
+    def __init__(self, means: np.ndarray, ownership: np.ndarray, categories: dict, stat_ids: list,
+                 playing_time_cv: float = 0.2, scale: float = 1.0):
+        """
+        :param means: players x stat_ids array of projected totals.
+        :param ownership: teams x players array, 1 where the team rosters the player.
+        :param categories: Dictionary of category stat id to isReverseItem (True when lower is better).
+        :param stat_ids: Stat id of each column of means.  Must include roto.component_stats(categories).
+        :param playing_time_cv: Coefficient of variation of each player's playing time around the projected PA/IP.
+        :param scale: Fraction of the projected season to simulate, for instance the share of a single matchup
+                      period.  1 simulates the full season.
+        """
+        self.means = np.asarray(means, dtype=np.float64) * scale
+        self.ownership = np.asarray(ownership, dtype=np.float64)
+        self.categories = dict(categories)
+        self.stat_ids = list(stat_ids)
+        self.playing_time_cv = playing_time_cv
+
+    @property
+    def n_teams(self):
+        return self.ownership.shape[0]
+
+    def sample_team_totals(self, simulations: int, rng: np.random.Generator):
+        """
+        Draws simulated component totals for every team.
+        :param simulations: Number of simulated seasons.
+        :param rng: numpy random Generator.
+        :return: simulations x teams x stat_ids float64 array.
+        """
+        n_players = self.means.shape[0]
+        if self.playing_time_cv > 0:
+            # Gamma factors with mean 1, shared by all stats of a player within a simulation
+            shape = 1 / self.playing_time_cv ** 2
+            playing_time = rng.gamma(shape, 1 / shape, size=(simulations, n_players, 1))
+        else:
+            playing_time = np.ones((simulations, n_players, 1))
+        samples = sample_poisson(self.means[None, :, :] * playing_time, rng)
+        # (simulations x stats x players) @ (players x teams), summed by roster -> simulations x teams x stats
+        return np.matmul(samples.transpose(0, 2, 1), self.ownership.T).transpose(0, 2, 1)
+
+    def simulate_chunk(self, simulations: int, seed=None):
+        """
+        Runs simulations and tallies finishing places and head-to-head results.
+        :param simulations: Number of simulated seasons.
+        :param seed: Seed or numpy SeedSequence of the random generator.
+        :return: A tuple of a teams x places array counting how often each team finished in each place (0 is first)
+                 and a teams x teams array of head-to-head wins of the row team against the column team, with
+                 category-tied matchups counted as half a win.
+        """
+        rng = np.random.default_rng(seed)
+        category_ids = list(self.categories)
+        reverse = np.array([self.categories[stat_id] for stat_id in category_ids], dtype=bool)
+
+        totals = self.sample_team_totals(simulations, rng)
+        values = category_values(totals, self.stat_ids, category_ids)  # simulations x teams x categories
+
+        # Roto: points per category across teams, then places by total points with random tie breaks
+        points = roto_points(values.transpose(1, 0, 2), reverse).sum(axis=-1).T  # simulations x teams
+        points = points + rng.random(points.shape) * 1e-6
+        places = (-points).argsort(axis=1).argsort(axis=1)
+        n_teams = self.n_teams
+        team_index = np.broadcast_to(np.arange(n_teams), places.shape)
+        place_counts = np.bincount((team_index * n_teams + places).ravel(),
+                                   minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+
+        # Head to head: categories won by each team against each other team
+        goodness = category_goodness(values, reverse)
+        won = (goodness[:, :, None, :] > goodness[:, None, :, :]).sum(axis=-1)  # simulations x teams x teams
+        lost = won.transpose(0, 2, 1)
+        h2h_wins = (won > lost).sum(axis=0) + 0.5 * (won == lost).sum(axis=0)
+        np.fill_diagonal(h2h_wins, 0)
+        return place_counts, h2h_wins
+
+    def run(self, simulations: int = 10000, workers: int = 1, chunk_size: int = 1000, seed=None):
+        """
+        Runs the simulations in chunks, on a process pool when workers > 1.
+        :param simulations: Number of simulated seasons.
+        :param workers: Number of processes.  1 runs every chunk in the calling process.
+        :param chunk_size: Simulations per chunk, which bounds the memory of the sample arrays.
+        :param seed: Seed of the random streams.  Chunks get independent streams spawned from it, so results are
+                     reproducible for a given seed and chunk_size regardless of workers.
+        :return: A tuple of the teams x places finishing probabilities and the teams x teams head-to-head win
+                 probabilities.
+        """
+        chunks = [min(chunk_size, simulations - start) for start in range(0, simulations, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self.simulate_chunk, chunks, seeds))
+        else:
+            results = [self.simulate_chunk(size, chunk_seed) for size, chunk_seed in zip(chunks, seeds)]
+        place_counts = sum(result[0] for result in results)
+        h2h_wins = sum(result[1] for result in results)
+        return place_counts / simulations, h2h_wins / simulations
+
+
+def projection_means(projections: np.ndarray, projection_stat_ids: list, stat_ids: list):
+    """
+    Selects the projected totals of stat_ids from a projection block, with 0 for missing projections.
+    :param projections: players x projection_stat_ids array, NaN where a player has no projection, such as the
+                        values of PlayerTable.projections.
+    :param projection_stat_ids: Stat id of each column of projections.
+    :param stat_ids: Stat ids to select.
+    :return: players x stat_ids float64 array.
+    """
+    position = {stat_id: i for i, stat_id in enumerate(projection_stat_ids)}
+    means = np.zeros((projections.shape[0], len(stat_ids)))
+    for column, stat_id in enumerate(stat_ids):
+        if stat_id in position:
+            means[:, column] = projections[:, position[stat_id]]
+    return np.nan_to_num(means, nan=0.0)
+
+
+def sample_poisson(means: np.ndarray, rng: np.random.Generator):
+    """
+    Draws Poisson samples, using a rounded normal approximation for means of NORMAL_APPROXIMATION_MEAN or more.
+    :param means: Array of Poisson means.
+    :param rng: numpy random Generator.
+    :return: float64 array of the shape of means.
+    """
+    samples = np.empty(means.shape)
+    large = means >= NORMAL_APPROXIMATION_MEAN
+    small_means = means[~large]
+    samples[~large] = rng.poisson(small_means)
+    large_means = means[large]
+    normal = large_means + np.sqrt(large_means) * rng.standard_normal(large_means.size)
+    samples[large] = np.maximum(np.rint(normal), 0)
+    return samples
@@ -0,0 +1,81 @@
+import numpy as np
+from espn_constant import HITTING_MAP, PITCHING_MAP
+
+# Stat id of the entry decode_long emits for a dictionary without any non-zero stat, so the row is not lost
+EMPTY_STAT_ID = -1
+
+
+class StatDecoder:
+    """
+    Decodes ESPN "stats" dictionaries, whose keys are stat ids as strings, into named or dense numeric form.
+    The column position of every stat id is computed once, keyed by the string form of the id, so decoding needs
+    no int() conversion or range check per entry.  Stat ids missing from the map are ignored.
+    """
+
+    def __init__(self, stat_map: dict):
+        """
+        :param stat_map: Dictionary of stat id to column name, such as HITTING_MAP or PITCHING_MAP.
+        """
+        self.columns = list(stat_map.values())
+        self.positions = {str(stat_id): i for i, stat_id in enumerate(stat_map)}
+        self.names = {str(stat_id): name for stat_id, name in stat_map.items()}
+        self.ids = {str(stat_id): int(stat_id) for stat_id in stat_map}
+
+    def decode(self, stat_dicts: list):
+        """
+        Decodes a batch of stats dictionaries into a dense block with one row per dictionary and one column per
+        stat of the map, in map order.  Missing stats are 0.
+        :param stat_dicts: List of ESPN stats dictionaries.
+        :return: numpy float64 array of shape (len(stat_dicts), len(columns))
+        """
+        width = len(self.columns)
+        positions = self.positions
+        # Filling a flat Python list and converting it once is cheaper than per-entry numpy assignments
+        flat = [0.0] * (len(stat_dicts) * width)
+        for row, stat_dict in enumerate(stat_dicts):
+            offset = row * width
+            for stat_id, value in stat_dict.items():
+                position = positions.get(stat_id)
+                if position is not None:
+                    flat[offset + position] = value
+        return np.array(flat, dtype=np.float64).reshape(len(stat_dicts), width)
+
+    def decode_long(self, stat_dicts: list):
+        """
+        Decodes a batch of stats dictionaries into long (sparse) form with one entry per non-zero stat.  Stats that
+        are missing or 0 have no entry, since the dense form stores them as 0.  A dictionary without any non-zero
+        stat gets a single entry with stat id EMPTY_STAT_ID and value 0, so every row of stat_dicts appears.
+        :param stat_dicts: List of ESPN stats dictionaries.
+        :return: A tuple of numpy arrays: the row of each entry in stat_dicts (int32), its stat id (int16) and its
+                 value (float32).
+        """
+        ids = self.ids
+        rows, stat_ids, values = [], [], []
+        for row, stat_dict in enumerate(stat_dicts):
+            entries = len(rows)
+            for stat_id, value in stat_dict.items():
+                if value:
+                    int_id = ids.get(stat_id)
+                    if int_id is not None:
+                        rows.append(row)
+                        stat_ids.append(int_id)
+                        values.append(value)
+            if len(rows) == entries:
+                rows.append(row)
+                stat_ids.append(EMPTY_STAT_ID)
+                values.append(0)
+        return (np.array(rows, dtype=np.int32), np.array(stat_ids, dtype=np.int16),
+                np.array(values, dtype=np.float32))
+
+    def to_dict(self, stat_dict: dict):
+        """
+        Renames the stats of one dictionary from stat id to column name, dropping ids missing from the map.
+        :param stat_dict: ESPN stats dictionary.
+        :return: dict
+        """
+        names = self.names
+        return {names[stat_id]: value for stat_id, value in stat_dict.items() if stat_id in names}
+
+
+HITTING_DECODER = StatDecoder(HITTING_MAP)
+PITCHING_DECODER = StatDecoder(PITCHING_MAP)
@@ -1,17 +1,24 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 from pandas.plotting import table
-from collections import defaultdict
-from League import League
+from league_history import aggregate_records, fetch_season_teams, team_records_frame
+from roto import roto_points
 
 
-def calculate_roto_standings(df, categories):
-    # This function still needs to be finished. Do not use yet
-    roto_scores = pd.DataFrame(index=df.index)
+def calculate_roto_standings(df, categories, lower_is_better=()):
+    """
+    Awards roto points for each category to the teams (rows) of df.  The best team in a category gets as many
+    points as there are teams and tied teams split the points of the places they share.
+    :param df: DataFrame with one row per team and one column per category.
+    :param categories: Category columns to score.
+    :param lower_is_better: Categories in which lower values are better, such as ERA and WHIP.
+    :return: DataFrame of the points per category and their sum in a Roto Points column.
+    """
     for col in categories:
         assert col in df.columns, f'Category {col} is not found in the dataframe.'
-        # Roto score calculation is wrong.  Revise below statement
-        roto_scores[col] = df[col].rank(ascending=False, method='min')
+    reverse = [col in lower_is_better for col in categories]
+    points = roto_points(df[list(categories)].to_numpy(dtype=float), reverse)
+    roto_scores = pd.DataFrame(points, index=df.index, columns=list(categories))
     roto_scores['Roto Points'] = roto_scores.sum(axis=1)
     return roto_scores
 
@@ -44,25 +51,17 @@ def aggregate_season_stats(hitting_data, pitching_data, league_names):
     return hitting_agg, pitching_agg
 
 
-def get_all_time_records(league_id, start_season, end_season, swid, espn_s2, filename='standings.png', names=None):
-    team_records = defaultdict(lambda: {'wins': 0, "losses": 0, "ties": 0, 'team_name': ''})
-
-    for season in range(start_season, end_season + 1):
-        league = League(league_id, season, swid=swid, espn_s2=espn_s2)
-
-        for team in league.teams:
-            swid = team.swid
-            record = team.record
-            team_id = team.team_id
-
-            team_records[swid]['wins'] += record['wins']
-            team_records[swid]['losses'] += record['losses']
-            team_records[swid]['ties'] += record['ties']
-
-            team_records[swid]['team_name'] = team.name
-            team_records[swid]['id'] = team_id
-
-    df = pd.DataFrame.from_dict(team_records, orient='index')
+def get_all_time_records(league_id, start_season, end_season, swid, espn_s2, filename='standings.png', names=None,
+                         cache=None, workers=8):
+    """
+    Compiles every manager's all-time record.  Only the teams of each season are fetched, concurrently, and all seasons
+    before 2018 come from a single leagueHistory request (see league_history).
+    :param cache: Optional cache.ResponseCache.  Completed seasons are cached permanently.
+    :param workers: Number of concurrent requests.
+    """
+    season_teams = fetch_season_teams(league_id, range(start_season, end_season + 1), swid, espn_s2, cache=cache,
+                                      workers=workers)
+    df = aggregate_records(team_records_frame(season_teams))
     # Renames the index if the variable names was given in the function call
     if names is None:
         df.index.name = 'SWID'
@@ -0,0 +1,87 @@
+import numpy as np
+from roto import category_values
+
+# Default position ids of pitchers (SP and RP); every other player is aggregated as a hitter
+PITCHER_POSITION_IDS = {1, 11}
+# Categories averaged over the team's hitters or pitchers, and categories computed as rates of summed components
+HITTER_COUNTING = [5, 20, 21, 23]
+HITTER_RATE = [9, 17]
+PITCHER_COUNTING = [34, 48, 53, 57, 63]
+PITCHER_RATE = [41, 47]
+
+
+def projected_categories(hitting_categories, pitching_categories):
+    """
+    :param hitting_categories: The league's hitting categories (stat ids).
+    :param pitching_categories: The league's pitching categories (stat ids).
+    :return: The categories that team projections are computed for, hitting first, in league order.
+    """
+    return ([stat_id for stat_id in hitting_categories if stat_id in HITTER_COUNTING + HITTER_RATE] +
+            [stat_id for stat_id in pitching_categories if stat_id in PITCHER_COUNTING + PITCHER_RATE])
+
+
+def team_category_values(hitter_totals: np.ndarray, hitter_counts: np.ndarray, pitcher_totals: np.ndarray,
+                         pitcher_counts: np.ndarray, stat_ids: list, categories: list):
+    """
+    Computes team projections from summed player projections.  Counting categories are the mean over the team's
+    hitters or pitchers, so they are NaN for a team without any; rate categories are computed from the summed
+    components (see roto.RATE_STATS) and are NaN when their denominator is 0.
+    :param hitter_totals: Array (..., stat_ids) of the projections summed over each team's hitters.
+    :param hitter_counts: Array (...) of the number of hitters of each team.
+    :param pitcher_totals: Array (..., stat_ids) of the projections summed over each team's pitchers.
+    :param pitcher_counts: Array (...) of the number of pitchers of each team.
+    :param stat_ids: Stat id of each entry of the last axis of the totals.  Stats missing from it are NaN.
+    :param categories: Category stat ids, as returned by projected_categories.
+    :return: float64 array (..., categories)
+    """
+    position = {stat_id: i for i, stat_id in enumerate(stat_ids)}
+    missing = np.full(hitter_counts.shape, np.nan)
+    values = []
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for stat_id in categories:
+            pitching = stat_id in PITCHER_COUNTING + PITCHER_RATE
+            totals, counts = (pitcher_totals, pitcher_counts) if pitching else (hitter_totals, hitter_counts)
+            if stat_id in HITTER_RATE + PITCHER_RATE:
+                try:
+                    values.append(category_values(totals, stat_ids, [stat_id])[..., 0])
+                except KeyError:
+                    values.append(missing)
+            elif stat_id in position:
+                values.append(np.where(counts > 0, totals[..., position[stat_id]] / counts, np.nan))
+            else:
+                values.append(missing)
+    return np.stack(values, axis=-1) if values else np.empty(hitter_counts.shape + (0,))
+
+
+def scenario_team_values(player_stats: np.ndarray, is_pitcher: np.ndarray, ownership: np.ndarray, team_ids: list,
+                         stat_ids: list, categories: list):
+    """
+    Computes team projections for many roster assignments at once.
+    :param player_stats: players x stat_ids array of projected totals, 0 where a player has no projection.
+    :param is_pitcher: Boolean per player.
+    :param ownership: scenarios x players array of the team id owning each player in each scenario, 0 (or any id
+                      not in team_ids) for players on no team.
+    :param team_ids: Team ids of the result's team axis.
+    :param stat_ids: Stat id of each column of player_stats.
+    :param categories: Category stat ids, as returned by projected_categories.
+    :return: float64 array of shape (scenarios, teams, categories)
+    """
+    ownership = np.atleast_2d(ownership)
+    n_scenarios, n_players = ownership.shape
+    # Team position of every (scenario, player), -1 for players on no team
+    ownership = ownership.astype(np.intp)
+    team_lookup = np.full(max(max(team_ids, default=0), int(ownership.max(initial=0))) + 1, -1)
+    team_lookup[list(team_ids)] = np.arange(len(team_ids))
+    positions = np.where(ownership >= 0, team_lookup[np.maximum(ownership, 0)], -1)
+    scenarios, players = np.nonzero(positions >= 0)
+    membership = np.zeros((n_scenarios, len(team_ids), n_players))
+    membership[scenarios, positions[scenarios, players], players] = 1
+
+    # Roster sums for every scenario and team as two matrix products
+    hitters = ~np.asarray(is_pitcher, dtype=bool)
+    player_stats = np.asarray(player_stats, dtype=np.float64)
+    hitter_totals = membership @ (player_stats * hitters[:, None])
+    pitcher_totals = membership @ (player_stats * ~hitters[:, None])
+    hitter_counts = membership @ hitters.astype(np.float64)
+    pitcher_counts = membership @ (~hitters).astype(np.float64)
+    return team_category_values(hitter_totals, hitter_counts, pitcher_totals, pitcher_counts, stat_ids, categories)
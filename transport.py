@@ -0,0 +1,116 @@
+import gzip
+import json
+import json_backend
+import random
+import threading
+import time
+import requests
+from requests.structures import CaseInsensitiveDict
+from cache import ResponseCache
+
+
+class ReplayMissError(requests.exceptions.RequestException):
+    """
+    Raised by ReplayTransport when a request was not recorded in the archive.
+    """
+
+
+def _open_archive(path: str, mode: str):
+    """
+    Opens a JSONL archive as text, gzip compressed if the path ends with .gz
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _request_key(url: str, params: dict, headers: dict):
+    return ResponseCache.make_key(url, params, (headers or {}).get("x-fantasy-filter"))
+
+
+class HTTPTransport:
+    """
+    Sends requests over the network with a requests Session.  This is the default transport of ESPNRequester.
+    """
+
+    def __init__(self, session: requests.Session):
+        self.session = session
+
+    def get(self, url: str, params: dict, headers: dict = None, cookies: dict = None, timeout: float = None):
+        """
+        :return: requests.Response
+        """
+        return self.session.get(url, params=params, cookies=cookies, headers=headers, timeout=timeout)
+
+
+class RecordingTransport:
+    """
+    Forwards requests to another transport and appends every request and response to a JSONL archive.
+    The archive is gzip compressed when its path ends with .gz.  It can be served back by ReplayTransport.
+    """
+
+    def __init__(self, path: str, transport):
+        """
+        :param path: Path of the archive.  Records are appended if it already exists.
+        :param transport: The transport that actually sends the requests, usually an HTTPTransport.
+        """
+        self.path = path
+        self.transport = transport
+        self._lock = threading.Lock()
+
+    def get(self, url: str, params: dict, headers: dict = None, cookies: dict = None, timeout: float = None):
+        response = self.transport.get(url, params=params, headers=headers, cookies=cookies, timeout=timeout)
+        record = {
+            "key": _request_key(url, params, headers),
+            "url": url,
+            "params": params,
+            "fantasy_filter": (headers or {}).get("x-fantasy-filter"),
+            "status": response.status_code,
+            "headers": {"Content-Type": response.headers.get("Content-Type", "application/json")},
+            "body": response.text,
+        }
+        with self._lock:
+            with _open_archive(self.path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+        return response
+
+
+class ReplayTransport:
+    """
+    Serves responses from an archive written by RecordingTransport without touching the network.
+    An optional simulated latency makes concurrency behave as it would against the live API.
+    """
+
+    # Replayed requests never reach ESPN, so ESPNRequester does not apply its rate limiter to them
+    rate_limited = False
+
+    def __init__(self, path: str, latency: float = 0.0, jitter: float = 0.0):
+        """
+        :param path: Path of the archive.
+        :param latency: Seconds every request takes.
+        :param jitter: Maximum random number of seconds added to the latency of each request.
+        """
+        self.path = path
+        self.latency = latency
+        self.jitter = jitter
+        self.records = {}
+        with _open_archive(path, "r") as f:
+            for line in f:
+                if line.strip():
+                    record = json_backend.loads(line)
+                    # A request recorded several times is answered with its latest response
+                    self.records[record["key"]] = record
+
+    def get(self, url: str, params: dict, headers: dict = None, cookies: dict = None, timeout: float = None):
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        record = self.records.get(_request_key(url, params, headers))
+        if record is None:
+            raise ReplayMissError(f"No recorded response for {url} with params {params}")
+        response = requests.models.Response()
+        response.status_code = record["status"]
+        response.headers = CaseInsensitiveDict(record["headers"])
+        response._content = record["body"].encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = url
+        return response